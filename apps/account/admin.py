@@ -1,11 +1,16 @@
 from django.contrib import admin
 from account.models import Account
+from account.search import search_accounts
 
 
 class AccountAdmin(admin.ModelAdmin):
     list_display = ('id', 'full_name', 'email', 'phone', 'date_created', 'is_active')
     readonly_fields = ('date_modified', 'date_created')
-    search_fields = ('id', 'full_name', 'email', 'phone')
+    search_fields = ('search_name', 'search_email', 'search_phone')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Prefix search on the indexed, normalized columns.
+        return search_accounts(queryset, search_term), False
 
 
 admin.site.register(Account, AccountAdmin)
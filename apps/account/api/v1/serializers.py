@@ -7,6 +7,7 @@ from rest_framework import serializers
 from rest_framework.exceptions import AuthenticationFailed
 
 from account.models import Account
+from core.serializers import ImageVariantsField, StorageURLField
 
 from django.utils.encoding import smart_str, force_str, DjangoUnicodeDecodeError
 from django.utils.encoding import smart_bytes
@@ -39,9 +40,8 @@ class LoginSerializer(serializers.ModelSerializer):
     tokens = serializers.SerializerMethodField(read_only=True)
 
     def get_tokens(self, obj):
-        email = obj.get('email')
-        tokens = Account.objects.get(email=email).tokens
-        return tokens
+        # The user authenticate() returned, no second query.
+        return obj['user'].tokens
 
     class Meta:
         model = Account
@@ -50,7 +50,7 @@ class LoginSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         email = attrs.get('email')
         password = attrs.get('password')
-        user = authenticate(email=email, password=password)
+        user = authenticate(self.context.get('request'), email=email, password=password)
         if not user:
             raise AuthenticationFailed({
                 'message': 'Email or password is not correct'
@@ -62,6 +62,7 @@ class LoginSerializer(serializers.ModelSerializer):
 
         data = {
             'email': user.email,
+            'user': user,
         }
         return data
 
@@ -83,9 +84,12 @@ class ResetPasswordSerializer(serializers.ModelSerializer):
 
 
 class AccountUpdateSerializer(serializers.ModelSerializer):
+    image_url = StorageURLField(source='image')
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Account
-        fields = ('id', 'full_name', 'image_url', 'email', 'phone',)
+        fields = ('id', 'full_name', 'image_url', 'image_variants', 'email', 'phone',)
 
 
 class AccountSerializer(serializers.ModelSerializer):
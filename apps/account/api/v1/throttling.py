@@ -0,0 +1,18 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+    """
+    Limits login attempts per email address and client address, so
+    guessing at one account is slowed down without anybody being able to
+    lock its owner out from elsewhere. The history is kept in the default
+    cache, so a shared CACHE_URL applies the limit over all workers, and a
+    throttled attempt is refused before any password is hashed.
+    """
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        email = email.strip().lower() if isinstance(email, str) else ''
+        ident = f'{email}|{self.get_ident(request)}'
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
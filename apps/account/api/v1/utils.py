@@ -1,9 +1,9 @@
-from django.core.mail import EmailMessage
+from apps.mail.outbox import enqueue
 
 
 class Util:
 
     @staticmethod
     def send_email(data: dict):
-        email = EmailMessage(to=[data['to_email']], subject=data['email_subject'], body=data['email_body'])
-        email.send()
\ No newline at end of file
+        # Queued, the mail outbox worker sends it after the request commits.
+        enqueue(data['to_email'], data['email_subject'], data['email_body'])
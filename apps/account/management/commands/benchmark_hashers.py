@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.hashers import benchmark, suggest_iterations
+
+
+class Command(BaseCommand):
+    help = 'Time each password hasher in PASSWORD_HASHERS and suggest PASSWORD_HASH_ITERATIONS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5, help='Hashes timed per hasher.')
+        parser.add_argument('--target-ms', type=float, default=100, help='Hashing time to aim for per login.')
+
+    def handle(self, *args, **options):
+        for algorithm, ms in benchmark(options['rounds']):
+            self.stdout.write(f'{algorithm:<20} {ms:8.1f} ms')
+        iterations = suggest_iterations(options['target_ms'], options['rounds'])
+        self.stdout.write(self.style.SUCCESS(f'PASSWORD_HASH_ITERATIONS={iterations}'))
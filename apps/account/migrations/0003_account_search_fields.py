@@ -0,0 +1,62 @@
+from django.db import migrations
+
+import account.search
+from account.search import search_values
+
+
+def fill_search_fields(apps, schema_editor):
+    Account = apps.get_model("account", "Account")
+    accounts = list(Account.objects.only("email", "phone", "full_name"))
+    for account in accounts:
+        for name, value in search_values(account).items():
+            setattr(account, name, value)
+    Account.objects.bulk_update(
+        accounts, ["search_email", "search_phone", "search_name"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account", "0002_account_image_variants"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="search_email",
+            field=account.search.SearchField(
+                blank=True,
+                db_index=True,
+                default="",
+                editable=False,
+                max_length=100,
+                verbose_name="Search email",
+            ),
+        ),
+        migrations.AddField(
+            model_name="account",
+            name="search_phone",
+            field=account.search.SearchField(
+                blank=True,
+                db_index=True,
+                default="",
+                editable=False,
+                max_length=16,
+                verbose_name="Search phone",
+            ),
+        ),
+        migrations.AddField(
+            model_name="account",
+            name="search_name",
+            field=account.search.SearchField(
+                blank=True,
+                db_index=True,
+                default="",
+                editable=False,
+                max_length=100,
+                verbose_name="Search name",
+            ),
+        ),
+        migrations.RunPython(fill_search_fields, migrations.RunPython.noop),
+    ]
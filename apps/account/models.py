@@ -2,9 +2,10 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils.safestring import mark_safe
 # from django.utils.translation import gettext_lazy as _
-from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from account.search import SearchField, search_values
+
 
 class AccountManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -41,11 +42,16 @@ class Account(AbstractBaseUser, PermissionsMixin):
     full_name = models.CharField(max_length=50, verbose_name='Full name', null=True)
     phone = models.CharField(max_length=16, verbose_name='Phone Number', null=True)
     image = models.ImageField(upload_to='accounts/', verbose_name='Account image', null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Image variants')
     is_superuser = models.BooleanField(default=False, verbose_name='Super user')
     is_staff = models.BooleanField(default=False, verbose_name='Staff user')
     is_active = models.BooleanField(default=True, verbose_name='Active user')
     date_modified = models.DateTimeField(auto_now=True, verbose_name='Date modified')
     date_created = models.DateTimeField(auto_now_add=True, verbose_name='Date created')
+    # Normalized copies for AccountListView search, filled in on save.
+    search_email = SearchField(verbose_name='Search email')
+    search_phone = SearchField(max_length=16, verbose_name='Search phone')
+    search_name = SearchField(verbose_name='Search name')
 
     objects = AccountManager()
 
@@ -58,6 +64,14 @@ class Account(AbstractBaseUser, PermissionsMixin):
             return f'{self.full_name} ({self.email})'
         return f'{self.email}'
 
+    def save(self, *args, **kwargs):
+        for name, value in search_values(self).items():
+            setattr(self, name, value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *search_values(self)}
+        super().save(*args, **kwargs)
+
     def image_tag(self):
         if self.image:
             return mark_safe(f'<a href="{self.image.url}"><img src="{self.image.url}" style="height:40px;"/></a>')
@@ -65,12 +79,10 @@ class Account(AbstractBaseUser, PermissionsMixin):
 
     @property
     def image_url(self):
+        # Built by the media storage, absolute when MEDIA_BASE_URL is set.
         if self.image:
-            if settings.DEBUG:
-                return f'{settings.LOCAL_BASE_URL}{self.image.url}'
-            return f'{settings.PROD_BASE_URL}{self.image.url}'
-        else:
-            return None
+            return self.image.url
+        return None
 
     @property
     def tokens(self):
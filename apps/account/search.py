@@ -0,0 +1,84 @@
+"""
+Account search over normalized columns.
+
+Every account stores its lowercased email, the digits of its phone
+number and its folded name (casefolded, accents and apostrophes
+removed). Queries are normalized the same way and matched as prefixes,
+which an index on the column can answer: PostgreSQL uses the
+`varchar_pattern_ops` index Django adds for indexed CharFields, and
+SQLite runs the `prefix` lookup as a case-sensitive GLOB.
+"""
+import re
+import unicodedata
+
+from django.db import models
+from django.db.models import Q
+from django.db.models.lookups import StartsWith
+
+APOSTROPHES = "'`ʻʼ‘’"
+MIN_PHONE_DIGITS = 3
+
+
+def fold(value):
+    value = unicodedata.normalize('NFKD', (value or '').casefold())
+    value = ''.join(char for char in value if not unicodedata.combining(char) and char not in APOSTROPHES)
+    return ' '.join(value.split())
+
+
+def digits(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def glob_escape(value):
+    return re.sub(r'([*?\[\]])', r'[\1]', value)
+
+
+class Prefix(StartsWith):
+    lookup_name = 'prefix'
+
+    def as_sqlite(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        return f'{lhs} GLOB %s', lhs_params + [glob_escape(self.rhs) + '*']
+
+
+class SearchField(models.CharField):
+    """
+    An indexed, normalized copy of another column, with the `prefix`
+    lookup.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('max_length', 100)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def get_internal_type(self):
+        return 'CharField'
+
+
+SearchField.register_lookup(Prefix)
+
+
+def search_values(account):
+    return {
+        'search_email': (account.email or '').strip().lower(),
+        'search_phone': digits(account.phone),
+        'search_name': fold(account.full_name)[:100],
+    }
+
+
+def search_accounts(queryset, query):
+    """
+    Accounts whose name, email or phone starts with `query`.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+    condition = Q(search_name__prefix=fold(query)) | Q(search_email__prefix=query.lower())
+    phone = digits(query)
+    if len(phone) >= MIN_PHONE_DIGITS:
+        condition |= Q(search_phone__prefix=phone)
+    return queryset.filter(condition)
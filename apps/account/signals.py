@@ -0,0 +1,6 @@
+from core import authentication  # noqa: F401  (drops cached JWT user snapshots on save)
+from core.images import watch_images
+from account.models import Account
+
+
+watch_images(Account)
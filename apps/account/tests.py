@@ -1,3 +1,29 @@
+from django.contrib.auth.models import User
+from django.db.models import CharField
 from django.test import TestCase
+from django.test.utils import register_lookup
 
-# Create your tests here.
+from .search import Prefix, digits, fold, glob_escape
+
+
+class AccountSearchTests(TestCase):
+    # The app is not installed, the lookup is tried on auth users.
+
+    def test_normalization(self):
+        self.assertEqual(fold('  Zoë   O’Brien '), 'zoe obrien')
+        self.assertEqual(fold(None), '')
+        self.assertEqual(digits('+998 (90) 123-45-67'), '998901234567')
+        self.assertEqual(glob_escape('a*b?[c]'), 'a[*]b[?][[]c[]]')
+
+    def test_prefix_lookup(self):
+        for username in ('ann', 'Anna', 'a*b', 'axb', 'a?c'):
+            User.objects.create(username=username)
+        with register_lookup(CharField, Prefix):
+            def matches(prefix):
+                users = User.objects.filter(username__prefix=prefix).order_by('username')
+                return list(users.values_list('username', flat=True))
+
+            self.assertEqual(matches('an'), ['ann'])
+            self.assertEqual(matches('a*'), ['a*b'])
+            self.assertEqual(matches('a?'), ['a?c'])
+            self.assertEqual(matches('[a'), [])
@@ -2,8 +2,10 @@ from django.contrib import admin
 from apps.blog.models import Category, Post
 from parler.admin import TranslatableAdmin
 
+from core.admin import TranslationBatchMixin, TranslatedRelatedFieldListFilter
 
-class CategoryAdmin(TranslatableAdmin):
+
+class CategoryAdmin(TranslationBatchMixin, TranslatableAdmin):
     list_display = ['name', 'slug']
     list_display_links = ['name']
     search_fields = ['name']
@@ -15,12 +17,12 @@ class CategoryAdmin(TranslatableAdmin):
     )
 
 
-class PostAdmin(TranslatableAdmin):
+class PostAdmin(TranslationBatchMixin, TranslatableAdmin):
     list_display = ['title', 'created_at', 'is_featured', 'views']
     list_display_links = ['title']
     search_fields = ['title', 'author', 'description']
     list_per_page = 20
-    list_filter = ['is_featured', 'categories']
+    list_filter = ['is_featured', ('categories', TranslatedRelatedFieldListFilter)]
     list_editable = ['is_featured']
 
     fieldsets = (
@@ -5,19 +5,19 @@ import datetime
 
 class PostFilter(filters.FilterSet):
     category = filters.CharFilter(field_name='categories__slug', lookup_expr='icontains', method='filter_category')
-    search = filters.CharFilter(field_name='translations__title', lookup_expr='icontains')
-    popular = filters.BooleanFilter(field_name='views', method='filter_popular')
+    search = filters.CharFilter(field_name='translations__title', lookup_expr='icontains', distinct=True)
+    popular = filters.BooleanFilter(field_name='popularity', method='filter_popular')
 
     class Meta:
         model = Post
         fields = ['category', 'search']
 
     def filter_category(self, queryset, name, value):
-        return queryset.filter(categories__slug__icontains=value)
+        return queryset.filter(categories__slug__icontains=value).distinct()
     
     def filter_popular(self, queryset, name, value):
         if value:
-            return queryset.all().order_by('-created_at__year', '-views')
+            return queryset.order_by('-popularity', '-pk')
         return queryset
 
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,38 @@
+# Generated by Django 4.1.7 on 2026-10-18 11:35
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# The scoring of core.popularity at the time of this migration, inlined
+# so later changes to it cannot change what the backfill does.
+POPULARITY_EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+POPULARITY_HALF_LIFE = datetime.timedelta(days=7)
+
+
+def decay_factor(when):
+    return 2 ** (((when or timezone.now()) - POPULARITY_EPOCH) / POPULARITY_HALF_LIFE)
+
+
+def backfill_popularity(apps, schema_editor):
+    # Past views have no timestamps, count them as of the post's creation.
+    Post = apps.get_model('blog', 'Post')
+    for post_id, views, created_at in Post.objects.filter(views__gt=0).values_list('pk', 'views', 'created_at'):
+        Post.objects.filter(pk=post_id).update(popularity=views * decay_factor(created_at))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='popularity',
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_popularity, migrations.RunPython.noop),
+    ]
@@ -33,11 +33,13 @@ class Post(TranslatableModel):
     )
     categories = models.ManyToManyField(Category, verbose_name=_('Kategoriyalar'))
     image = models.ImageField(upload_to='post_images', verbose_name=_('Rasm'))
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(verbose_name=_('Created at'))
     updated_at = models.DateTimeField(verbose_name=_('Updated at'))
     is_featured = models.BooleanField(default=False, verbose_name=_('Maxus post'))
     slug = models.SlugField(max_length=255, verbose_name=_('Slug'))
     views = models.IntegerField(default=0, verbose_name=_('Ko\'rilganlar soni'))
+    popularity = models.FloatField(default=0, db_index=True, editable=False)
 
     def __str__(self):
         return self.title
@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from parler_rest.serializers import TranslatableModelSerializer
 from parler_rest.fields import TranslatedFieldsField
+
+from core.serializers import CompactTranslationsMixin, ImageVariantsField
 from .models import Category, Post
 
 
-class CategorySerializer(TranslatableModelSerializer):
+class CategorySerializer(CompactTranslationsMixin, TranslatableModelSerializer):
     translations = TranslatedFieldsField(shared_model=Category)
 
     class Meta:
@@ -13,21 +15,23 @@ class CategorySerializer(TranslatableModelSerializer):
         ref_name = 'CategorySerializer'
 
 
-class PostSerializer(TranslatableModelSerializer):
+class PostSerializer(CompactTranslationsMixin, TranslatableModelSerializer):
     translations = TranslatedFieldsField(shared_model=Post)
+    image_variants = ImageVariantsField()
     categories = CategorySerializer(many=True)
     
     class Meta:
         model = Post
-        fields = '__all__'
+        exclude = ['popularity']
 
 
-class PostRetrieveSerializer(TranslatableModelSerializer):
+class PostRetrieveSerializer(CompactTranslationsMixin, TranslatableModelSerializer):
     translations = TranslatedFieldsField(shared_model=Post)
+    image_variants = ImageVariantsField()
     categories = CategorySerializer(many=True)
 
     
     class Meta:
         model = Post
-        fields = '__all__'
+        exclude = ['popularity']
         
\ No newline at end of file
@@ -0,0 +1,7 @@
+from core.images import watch_images
+from core.response_cache import watch_models
+from .models import Category, Post
+
+
+watch_models(Category, Post)
+watch_images(Post)
@@ -1,3 +1,147 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.counters import BufferedCounter, WindowedBloomFilter, flush_counters
+from core.testing import QueryBudgetTestCase
+from .models import Category, Post
+from .views import post_views, post_popularity
+
+
+class PostQueryBudgetTests(QueryBudgetTestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='News', slug='news')
+        self.post = self.create_post()
+
+    def create_post(self):
+        now = timezone.now()
+        post = Post(image='post_images/post.jpg', created_at=now, updated_at=now, slug='post')
+        for language in ('uz', 'en', 'ru'):
+            post.set_current_language(language)
+            post.title = f'Title {language}'
+            post.description = 'Description'
+            post.content = 'Content'
+        post.save()
+        post.categories.add(self.category)
+        return post
+
+    def grow(self):
+        for index in range(5):
+            self.create_post()
+
+    def test_post_list(self):
+        self.assertQueryBudget('/blog/posts/', 5, grow=self.grow)
+
+    def test_cached_retrieve_still_counts_views(self):
+        url = f'/blog/posts/{self.post.pk}/'
+        self.client.get(url, REMOTE_ADDR='10.0.0.1')
+        self.client.get(url, REMOTE_ADDR='10.0.0.1')
+        response = self.client.get(url, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.client.get('/blog/posts/999/', REMOTE_ADDR='10.0.0.3')
+        post_views.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+
+    def test_category_posts(self):
+        self.assertQueryBudget('/blog/categories/news/posts/', 6, grow=self.grow)
+
+    def test_category_posts_are_paginated(self):
+        self.grow()
+        first = self.client.get('/blog/categories/news/posts/?page_size=4').json()
+        self.assertEqual(len(first['results']), 4)
+        second = self.client.get(first['links']['next']).json()
+        self.assertEqual(len(second['results']), 2)
+        self.assertIsNone(second['links']['next'])
+
+
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        post_views.pending.clear()
+        post_popularity.pending.clear()
+
+    def test_window_rotation(self):
+        seen = WindowedBloomFilter(window=60)
+        self.assertTrue(seen.add('a', now=0))
+        self.assertFalse(seen.add('a', now=30))
+        self.assertFalse(seen.add('a', now=90))
+        self.assertTrue(seen.add('a', now=150))
+
+    def test_popular_posts(self):
+        now = timezone.now()
+        quiet, read = [
+            Post.objects.create(image='post_images/post.jpg', created_at=now, updated_at=now, slug=slug)
+            for slug in ('quiet', 'read')
+        ]
+        self.client.get(f'/blog/posts/{read.pk}/')
+        post_views.flush()
+        post_popularity.flush()
+        response = self.client.get('/blog/posts/', {'popular': 'true'})
+        self.assertEqual([item['id'] for item in response.json()['results']], [read.pk, quiet.pk])
+
+    def test_flush_batches_by_amount(self):
+        now = timezone.now()
+        posts = [
+            Post.objects.create(image='post_images/post.jpg', created_at=now, updated_at=now, slug=f'post-{index}')
+            for index in range(3)
+        ]
+        for post, views in zip(posts, (1, 1, 3)):
+            for visitor in range(views):
+                post_views.record(post.pk, f'visitor-{visitor}')
+        with self.assertNumQueries(2):
+            post_views.flush()
+        self.assertEqual(
+            list(Post.objects.filter(pk__in=[post.pk for post in posts]).order_by('pk').values_list('views', flat=True)),
+            [1, 1, 3],
+        )
+
+    def test_flush_refreshes_cached_posts(self):
+        now = timezone.now()
+        post = Post.objects.create(image='post_images/post.jpg', created_at=now, updated_at=now, slug='post')
+        url = f'/blog/posts/{post.pk}/'
+        first = self.client.get(url)
+        self.assertEqual(first.json()['views'], 0)
+        post_views.last_bump = None
+        post_views.flush()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['views'], 1)
+
+    def test_version_bumps_are_throttled(self):
+        counter = BufferedCounter(Post, 'views', version_interval=60)
+        counter.stale = True
+        self.assertTrue(counter.bump_version())
+        counter.stale = True
+        self.assertFalse(counter.bump_version())
+        counter.last_bump -= 60
+        self.assertTrue(counter.bump_version())
+
+    def test_failed_flush_keeps_increments(self):
+        now = timezone.now()
+        post = Post.objects.create(image='post_images/post.jpg', created_at=now, updated_at=now, slug='post')
+        post_views.record(post.pk, 'visitor')
+        with mock.patch.object(QuerySet, 'update', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                post_views.flush()
+        self.assertEqual(dict(post_views.pending), {post.pk: 1})
+        flush_counters()
+        post.refresh_from_db()
+        self.assertEqual(post.views, 1)
+
+    @override_settings(COUNTER_FLUSH_THREAD=True)
+    def test_flush_thread(self):
+        flushed = threading.Event()
+
+        def flush():
+            flushed.set()
+            raise SystemExit  # ends the thread
+
+        counter = BufferedCounter(Post, 'views', flush_interval=0.01)
+        with mock.patch.object(counter, 'flush', side_effect=flush):
+            counter.start_timer()
+            self.assertTrue(flushed.wait(5))
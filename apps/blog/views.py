@@ -2,36 +2,56 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from django_filters.rest_framework import DjangoFilterBackend
 from apps.blog.models import Category, Post
 from .serializers import CategorySerializer, PostSerializer, PostRetrieveSerializer
 from .filters import PostFilter
+from core.paginations import KeysetPagination
+from core.query_planning import QueryPlanMixin, plan_queryset
+from core.conditional import ConditionalGetMixin
+from core.counters import BufferedCounter, get_visitor
+from core.popularity import PopularityCounter
+from core.response_cache import CachedResponseMixin
 
+post_views = BufferedCounter(Post, 'views', dedupe_window=60 * 60 * 24)
+post_popularity = PopularityCounter(Post)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     http_method_names = ['get', 'head', 'options']
+    authentication_classes = []
     lookup_field = 'slug'
+    pagination_class = KeysetPagination
+    cache_models = [Category, Post]
 
     @action(detail=True, methods=['get', 'head', 'options'])
     def posts(self, request, slug=None):
+        return self.cached_response(request, self.list_posts, slug=slug)
+
+    def list_posts(self, request, slug=None):
         category = self.get_object()    
         if not category:
             return Response(status=status.HTTP_404_NOT_FOUND)
-        pagination = self.paginate_queryset(category.post_set.all())
+        queryset = plan_queryset(category.post_set.order_by('-updated_at'), PostSerializer())
+        pagination = self.paginate_queryset(queryset)
         if pagination is not None:
             serializer = PostSerializer(pagination, many=True)
             return self.get_paginated_response(serializer.data)
-        queryset = category.post_set.all()
         serializer = PostSerializer(queryset, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all().order_by('-updated_at')
     serializer_class = PostSerializer
     http_method_names = ['get', 'head', 'options']
+    authentication_classes = []
     filterset_class = PostFilter
+    filter_backends = [DjangoFilterBackend]
+    pagination_class = KeysetPagination
+    cache_models = [Post, Category]
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -39,12 +59,9 @@ class PostViewSet(viewsets.ModelViewSet):
         return super().get_serializer_class()
     
     def retrieve(self, request, *args, **kwargs):
-        saved_views = request.session.get('views', [])
-        post = self.get_object()
-        if post.id not in saved_views:
-            post.views += 1
-            post.save()
-            saved_views.append(post.id)
-            request.session['views'] = saved_views
-        return super().retrieve(request, *args, **kwargs)
-    
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            pk = int(kwargs[self.lookup_field])
+            if post_views.record(pk, get_visitor(request)):
+                post_popularity.record(pk)
+        return response
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from core.admin import OutboxAdmin
+from .models import Email
+
+
+@admin.register(Email)
+class EmailAdmin(OutboxAdmin):
+    list_display = ['to_email', 'subject', 'status', 'attempts', 'created_at', 'sent_at']
+    search_fields = ['to_email', 'subject']
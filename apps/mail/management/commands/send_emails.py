@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.mail.outbox import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send what is due and exit.')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = dispatch_pending()
+            if sent:
+                self.stdout.write(f'{sent} emails sent.')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,22 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from core.outbox import OutboxModel
+
+
+class Email(OutboxModel):
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = _('Email')
+        verbose_name_plural = _('Emails')
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='mail_email_due_idx'),
+            models.Index(fields=['claim'], name='mail_email_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.to_email}: {self.subject}'
@@ -0,0 +1,95 @@
+"""
+Durable email outbox.
+
+`enqueue` only inserts rows, so views never wait on SMTP. Once the
+transaction commits, the `send_emails` task (or the `send_emails`
+command) claims up to `BATCH_SIZE` due emails and sends them over a
+single connection of the configured `EMAIL_BACKEND`. Delivery status is stored
+per email, and failures are retried with backoff (see `core.outbox`).
+"""
+import smtplib
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+
+from core.outbox import DeliveryError, claim_due, record_results
+from .models import Email
+
+BATCH_SIZE = 50
+
+
+def enqueue(to, subject, body, from_email=''):
+    """
+    Queue an email for one address or a list of addresses. Returns the rows.
+    """
+    if isinstance(to, str):
+        to = [to]
+    emails = Email.objects.bulk_create([
+        Email(to_email=address, subject=subject, body=body, from_email=from_email or '')
+        for address in to if address
+    ])
+    if emails:
+        transaction.on_commit(wake_worker)
+    return emails
+
+
+def _as_delivery_error(error):
+    # Refused recipients and 5xx replies will not succeed on a later try.
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return DeliveryError(str(error), retry=False)
+    if isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500:
+        return DeliveryError(str(error), retry=False)
+    return DeliveryError(str(error))
+
+
+def dispatch(connection=None):
+    """
+    Send one batch of due emails. Returns `(sent, failed)` counts.
+    """
+    emails = claim_due(Email, BATCH_SIZE)
+    if not emails:
+        return 0, 0
+    errors = {}
+    sent = set()
+    try:
+        connection = connection or get_connection()
+        with connection:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email or None,
+                    to=[email.to_email],
+                    connection=connection,
+                )
+                try:
+                    connection.send_messages([message])
+                except (smtplib.SMTPException, OSError) as error:
+                    errors[email.pk] = _as_delivery_error(error)
+                else:
+                    sent.add(email.pk)
+    except (smtplib.SMTPException, OSError) as error:
+        # The connection itself failed (opening, or closing after the
+        # batch). Retry what was not sent yet; sent emails stay sent.
+        for email in emails:
+            if email.pk not in sent:
+                errors.setdefault(email.pk, _as_delivery_error(error))
+    record_results(emails, errors)
+    return len(emails) - len(errors), len(errors)
+
+
+def dispatch_pending(connection=None):
+    """
+    Send batches until no email is due. Returns the number sent.
+    """
+    total = 0
+    while True:
+        sent, failed = dispatch(connection)
+        total += sent
+        if not sent and not failed:
+            return total
+
+
+def wake_worker():
+    from .tasks import send_emails
+    send_emails.delay()
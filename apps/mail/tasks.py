@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .outbox import dispatch_pending
+
+
+@shared_task
+def send_emails():
+    return dispatch_pending()
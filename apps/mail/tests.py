@@ -0,0 +1,82 @@
+import smtplib
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import get_connection
+from django.contrib.auth.models import User
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import Email
+from .outbox import dispatch, dispatch_pending, enqueue
+
+
+class FlakyBackend(EmailBackend):
+    def send_messages(self, messages):
+        address = messages[0].to[0]
+        if address.startswith('refused'):
+            raise smtplib.SMTPRecipientsRefused({address: (550, b'No such user')})
+        if address.startswith('busy'):
+            raise smtplib.SMTPResponseException(451, b'Try again later')
+        return super().send_messages(messages)
+
+
+class DroppedBackend(EmailBackend):
+    """
+    Sends the first message, then loses the connection.
+    """
+
+    def send_messages(self, messages):
+        if mail.outbox:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        return super().send_messages(messages)
+
+    def close(self):
+        raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+
+
+class MailOutboxTests(TestCase):
+    def test_batch_shares_one_connection(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            enqueue(['a@example.com', 'b@example.com', 'c@example.com'], 'Hello', 'Body')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(mail.outbox, [])
+
+        with mock.patch('apps.mail.outbox.get_connection', wraps=get_connection) as connect:
+            self.assertEqual(dispatch_pending(), 3)
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox), ['a@example.com', 'b@example.com', 'c@example.com'],
+        )
+        self.assertEqual(Email.objects.filter(status=Email.SENT, attempts=1).count(), 3)
+
+    def test_delivery_status(self):
+        enqueue(['ok@example.com', 'refused@example.com', 'busy@example.com'], 'Hello', 'Body')
+        self.assertEqual(dispatch(FlakyBackend()), (1, 2))
+        statuses = dict(Email.objects.values_list('to_email', 'status'))
+        self.assertEqual(statuses, {
+            'ok@example.com': Email.SENT,
+            'refused@example.com': Email.FAILED,
+            'busy@example.com': Email.PENDING,
+        })
+        self.assertIn('451', Email.objects.get(to_email='busy@example.com').last_error)
+
+    def test_lost_connection_keeps_sent_emails(self):
+        enqueue(['a@example.com', 'b@example.com'], 'Hello', 'Body')
+        self.assertEqual(dispatch(DroppedBackend()), (1, 1))
+        statuses = dict(Email.objects.values_list('to_email', 'status'))
+        self.assertEqual(statuses, {'a@example.com': Email.SENT, 'b@example.com': Email.PENDING})
+
+
+class MailTaskTests(TestCase):
+    def test_commit_runs_task_with_metrics(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'secret'))
+        client.delete('/task-stats/')
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue('a@example.com', 'Hello', 'Body')
+        self.assertEqual(len(mail.outbox), 1)
+        stats = client.get('/task-stats/').json()
+        self.assertEqual(stats['apps.mail.tasks.send_emails']['count'], 1)
+        self.assertEqual(stats['apps.mail.tasks.send_emails']['failures'], 0)
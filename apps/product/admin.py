@@ -1,10 +1,15 @@
 from django.contrib import admin
-from .models import Company, Category, Product, ProductRating, CompanyProduct, SubCategory,ProductImage , Application, Question
+from .models import Company, Category, Product, ProductRating, CompanyProduct, SubCategory,ProductImage , Tag, Application, Question
 from parler.admin import TranslatableAdmin
+from django.http import StreamingHttpResponse
+
+from core.admin import TranslationBatchMixin, TranslatedRelatedFieldListFilter
+from .transfer import export_lines
 
 @admin.register(ProductRating)
-class ProductRatingAdmin(admin.ModelAdmin):
+class ProductRatingAdmin(TranslationBatchMixin, admin.ModelAdmin):
     list_display = ['name','product', 'star', 'review_date', 'email']
+    translation_related = ['product']
     list_filter = ['star']
     search_fields = ['product__name', 'email']
     list_per_page = 20
@@ -16,13 +21,22 @@ class ProductRatingAdmin(admin.ModelAdmin):
     )
     readonly_fields = ['review_date']
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'product_count']
+    search_fields = ['name']
+    readonly_fields = ['product_count']
+    list_per_page = 50
+
+
 @admin.register(CompanyProduct)
-class CompanyProductAdmin(admin.ModelAdmin):
+class CompanyProductAdmin(TranslationBatchMixin, admin.ModelAdmin):
     list_display = ['company', 'product']
+    translation_related = ['product']
     search_fields = ['company__name', 'product__name']
 
 
-class CategoryAdmin(TranslatableAdmin):
+class CategoryAdmin(TranslationBatchMixin, TranslatableAdmin):
     list_display = ['name']
     list_display_links = ['name',]
     search_fields = ['name']
@@ -40,13 +54,14 @@ class ProductImageInline(admin.TabularInline):
     model = ProductImage
 
 
-class ProductAdmin(TranslatableAdmin):
+class ProductAdmin(TranslationBatchMixin, TranslatableAdmin):
     inlines = [ProductImageInline]
+    actions = ['export_csv', 'export_jsonl']
     list_display = ['name', 'created_at', 'is_featured', 'company']
     list_display_links = ['name']
     search_fields = ['name', 'compound', 'tag']
     list_per_page = 20
-    list_filter = ['is_featured', 'category']
+    list_filter = ['is_featured', ('category', TranslatedRelatedFieldListFilter)]
     list_editable = ['is_featured']
 
     fieldsets = (
@@ -55,13 +70,27 @@ class ProductAdmin(TranslatableAdmin):
         },),
     )
 
+    def export(self, queryset, format, content_type):
+        response = StreamingHttpResponse(export_lines(queryset, format=format), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="products.{format}"'
+        return response
+
+    @admin.action(description='Export selected products as CSV')
+    def export_csv(self, request, queryset):
+        return self.export(queryset, 'csv', 'text/csv; charset=utf-8')
+
+    @admin.action(description='Export selected products as JSON lines')
+    def export_jsonl(self, request, queryset):
+        return self.export(queryset, 'jsonl', 'application/x-ndjson; charset=utf-8')
+
 admin.site.register(Product, ProductAdmin)
 
 from django.utils.html import format_html
 
 
-class CompanyAdmin(TranslatableAdmin):
+class CompanyAdmin(TranslationBatchMixin, TranslatableAdmin):
     list_display = ['name', 'type_product', 'country', 'created_at']
+    translation_related = ['type_product']
     list_display_links = ['name']
     search_fields = ['name', 'type_product__name']
     list_per_page = 20
@@ -88,11 +117,12 @@ class CompanyAdmin(TranslatableAdmin):
 
 
 
-class SubCategoryAdmin(TranslatableAdmin):
+class SubCategoryAdmin(TranslationBatchMixin, TranslatableAdmin):
     list_display = ['name', 'category', 'is_active']
     list_display_links = ['name']
     search_fields = ['name', 'category__name']
-    list_filter = ['category', 'is_active']
+    list_filter = [('category', TranslatedRelatedFieldListFilter), 'is_active']
+    translation_related = ['category']
     list_per_page = 20
 
     fieldsets = (
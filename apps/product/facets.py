@@ -0,0 +1,95 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils.translation import get_language
+
+from core.cache_versions import get_version, bump_version
+from core.translations import translated_subquery
+from .countries import Country
+from .filters import ProductFilter
+from .models import Product, Category, SubCategory, Company
+
+CATALOG_VERSION = 'product-catalog'
+FACET_CACHE_TIMEOUT = 60 * 60
+
+# filter name -> lookup the facet groups by
+FACETS = {
+    'category': 'category',
+    'parent_category': 'category__category',
+    'company': 'company',
+    'country': 'company__country',
+    'featured': 'is_featured',
+}
+
+
+def _translated_labels(model, ids):
+    rows = model.objects.filter(pk__in=ids).values_list('pk', translated_subquery(model, 'name'))
+    return dict(rows)
+
+
+def _labels(facet, values):
+    if facet == 'category':
+        return _translated_labels(SubCategory, values)
+    if facet == 'parent_category':
+        return _translated_labels(Category, values)
+    if facet == 'company':
+        return dict(Company.objects.filter(pk__in=values).values_list('pk', 'name'))
+    if facet == 'country':
+        return {value: str(Country(value).label) for value in values if value in Country.values}
+    return {}
+
+
+def _cache_key(data):
+    state = '&'.join(f'{key}={data[key]}' for key in sorted(data) if data[key] not in ('', None))
+    digest = hashlib.md5(state.encode()).hexdigest()
+    return f'product-facets:{get_version(CATALOG_VERSION)}:{get_language()}:{digest}'
+
+
+def compute_facets(data, queryset=None):
+    """
+    Count products per facet value for the filter state in `data`.
+
+    Each facet is counted with every other active filter applied but not
+    its own, so a buyer sees how many results each alternative value would
+    give. Every facet is a single grouped query.
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+    data = {key: value for key, value in data.items() if key in ProductFilter.base_filters}
+
+    total = ProductFilter(data, queryset=queryset).qs.order_by().values('pk').distinct().count()
+    facets = {}
+    for facet, lookup in FACETS.items():
+        others = {key: value for key, value in data.items() if key != facet}
+        rows = (
+            ProductFilter(others, queryset=queryset).qs
+            .order_by()
+            .values(lookup)
+            .annotate(count=Count('pk', distinct=True))
+            .order_by('-count')
+        )
+        counts = [(row[lookup], row['count']) for row in rows if row[lookup] is not None]
+        labels = _labels(facet, [value for value, count in counts])
+        facets[facet] = [
+            {'value': value, 'label': labels.get(value, value), 'count': count}
+            for value, count in counts
+        ]
+    return {'count': total, 'facets': facets}
+
+
+def get_facets(data):
+    """
+    Cached `compute_facets`; entries are dropped when the catalog changes.
+    """
+    data = {key: value for key, value in data.items() if key in ProductFilter.base_filters}
+    key = _cache_key(data)
+    result = cache.get(key)
+    if result is None:
+        result = compute_facets(data)
+        cache.set(key, result, FACET_CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_facets():
+    bump_version(CATALOG_VERSION)
@@ -1,26 +1,45 @@
 from django_filters import rest_framework as filters
 from .models import Product, Category
+from .countries import Country
+from .search import filter_by_search
+from .tags import normalize_tag
 import datetime
 
 
 class ProductFilter(filters.FilterSet):
-    search = filters.CharFilter(field_name='translations__name', lookup_expr='icontains')
-    popular = filters.BooleanFilter(field_name='views', method='filter_popular')
+    category = filters.NumberFilter(field_name='category')
+    parent_category = filters.NumberFilter(field_name='category__category')
+    company = filters.NumberFilter(field_name='company')
+    country = filters.ChoiceFilter(field_name='company__country', choices=Country.choices)
+    featured = filters.BooleanFilter(field_name='is_featured')
+    search = filters.CharFilter(method='filter_search')
+    popular = filters.BooleanFilter(method='filter_popular')
+    min_rating = filters.NumberFilter(field_name='rating_average', lookup_expr='gte')
+    tag = filters.CharFilter(method='filter_tag')
 
     class Meta:
         model = Product
-        fields = ['category', 'search']
+        fields = ['category', 'parent_category', 'company', 'country', 'featured', 'search', 'min_rating', 'tag']
+
+    def filter_search(self, queryset, name, value):
+        return filter_by_search(queryset, value)
+
+    def filter_tag(self, queryset, name, value):
+        return queryset.filter(product_tags__tag__name=normalize_tag(value))
 
-    def filter_category(self, queryset, name, value):
-        return queryset.filter(categories__slug__icontains=value)
-    
     def filter_popular(self, queryset, name, value):
         if value:
-            return queryset.all().order_by('-created_at__year', '-views')
+            return queryset.order_by('-popularity', '-pk')
         return queryset
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.filters['category'].label = 'Category'
+        self.filters['parent_category'].label = 'Parent category'
+        self.filters['company'].label = 'Company'
+        self.filters['country'].label = 'Country'
+        self.filters['featured'].label = 'Featured'
         self.filters['search'].label = 'Search'
-        self.filters['popular'].label = 'Popular'
\ No newline at end of file
+        self.filters['popular'].label = 'Popular'
+        self.filters['min_rating'].label = 'Minimum rating'
+        self.filters['tag'].label = 'Tag'
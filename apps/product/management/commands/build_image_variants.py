@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.images import WATCHED_MODELS, build_variants, build_in_worker
+
+
+class Command(BaseCommand):
+    help = 'Render missing responsive image derivatives for existing media.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render images that already have derivatives.')
+        parser.add_argument(
+            '--workers', type=int, default=settings.IMAGE_DERIVATIVE_WORKERS,
+            help='Rendering threads, 0 renders in this thread.',
+        )
+
+    def pending(self, model, field, force):
+        rows = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+        for pk, name, variants in rows.values_list('pk', field, 'image_variants').iterator():
+            if force or (variants or {}).get('source') != name:
+                yield pk
+
+    def handle(self, *args, **options):
+        for model, field in WATCHED_MODELS.items():
+            pks = list(self.pending(model, field, options['force']))
+            if options['workers']:
+                with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                    list(executor.map(lambda pk: build_in_worker(model, pk, field), pks))
+            else:
+                for pk in pks:
+                    build_variants(model, pk, field)
+            self.stdout.write(f'{model._meta.label}: {len(pks)} images rendered.')
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.product.transfer import export_lines, guess_format
+
+
+class Command(BaseCommand):
+    help = 'Export every product as CSV or JSON lines, in the import format.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='Output file, - for stdout.')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or guess_format(path)
+        if path == '-':
+            self.write(self.stdout, format)
+            return
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            self.write(file, format)
+
+    def write(self, file, format):
+        for line in export_lines(format=format):
+            file.write(line)
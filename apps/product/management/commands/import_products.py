@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from apps.product.transfer import CHUNK_SIZE, ProductImporter, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Import products from a CSV or JSON lines file in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file, see apps/product/transfer.py for the columns.')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--progress', help='Progress file to resume from, defaults to <path>.progress.',
+        )
+        parser.add_argument('--restart', action='store_true', help='Ignore the progress file and start over.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        progress_path = options['progress'] or f'{path}.progress'
+        if options['restart']:
+            open(progress_path, 'w').close()
+
+        importer = ProductImporter(chunk_size=options['chunk_size'], progress_path=progress_path)
+        resume_line = importer.get_resume_line()
+        if resume_line:
+            self.stdout.write(f'Resuming after line {resume_line}.')
+        with open(path, newline='', encoding='utf-8-sig') as file:
+            imported = importer.run(read_rows(file, options['format'] or guess_format(path)))
+
+        for error in importer.errors:
+            self.stderr.write(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} products, rejected {len(importer.errors)} rows. '
+            'Run build_image_variants to render the image derivatives.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.product.ratings import rebuild_rating_aggregates
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized rating count, sum, average and histogram of products.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_ids', nargs='*', type=int, help='Only rebuild these products.')
+
+    def handle(self, *args, **options):
+        updated = rebuild_rating_aggregates(options['product_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating aggregates for {updated} products.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.product.search import index_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of product translations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_ids', nargs='*', type=int, help='Only reindex these products.')
+
+    def handle(self, *args, **options):
+        if not index_available():
+            self.stderr.write('The search index table does not exist on this database, run migrate first.')
+            return
+        indexed = rebuild_index(options['product_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} product translations.'))
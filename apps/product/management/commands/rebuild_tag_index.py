@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.product.tags import rebuild_tag_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the normalized product tag table and the per-tag product counts.'
+
+    def handle(self, *args, **options):
+        written = rebuild_tag_index()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} product tags.'))
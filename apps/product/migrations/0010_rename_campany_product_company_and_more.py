@@ -0,0 +1,51 @@
+# Generated by Django 4.1.7 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0009_alter_company_country_alter_company_facebook_and_more'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='product',
+            old_name='campany',
+            new_name='company',
+        ),
+        migrations.RenameField(
+            model_name='application',
+            old_name='campany_name',
+            new_name='company_name',
+        ),
+        migrations.RenameField(
+            model_name='application',
+            old_name='lacation',
+            new_name='location',
+        ),
+        migrations.RenameField(
+            model_name='question',
+            old_name='lacation',
+            new_name='location',
+        ),
+        migrations.AlterModelOptions(
+            name='company',
+            options={'verbose_name': 'Kampania', 'verbose_name_plural': 'Kampaniyalar'},
+        ),
+        migrations.AlterModelOptions(
+            name='companytranslation',
+            options={'default_permissions': (), 'managed': True, 'verbose_name': 'Kampania Translation'},
+        ),
+        migrations.AlterField(
+            model_name='application',
+            name='location',
+            field=models.CharField(help_text='Davlatlar', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='location',
+            field=models.CharField(help_text='Davlatlar', max_length=255),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.1.7 on 2026-10-18 11:22
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Product = apps.get_model('product', 'Product')
+    ProductRating = apps.get_model('product', 'ProductRating')
+
+    histograms = defaultdict(dict)
+    for row in ProductRating.objects.order_by().values('product_id', 'star').annotate(n=Count('id')):
+        histograms[row['product_id']][str(row['star'])] = row['n']
+
+    for product_id, histogram in histograms.items():
+        count = sum(histogram.values())
+        total = sum(int(star) * n for star, n in histogram.items())
+        Product.objects.filter(pk=product_id).update(
+            rating_count=count,
+            rating_sum=total,
+            rating_average=total / count,
+            rating_histogram=histogram,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0010_rename_campany_product_company_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_average',
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_histogram',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='productrating',
+            name='star',
+            field=models.IntegerField(db_index=True, default=0, verbose_name='star'),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
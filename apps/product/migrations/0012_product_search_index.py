@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# The statements are inlined, so later changes to apps.product.search
+# cannot change what this migration does.
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS product_search_fts USING fts5(
+        name, tag, description, compound,
+        product_id UNINDEXED, language_code UNINDEXED,
+        tokenize="unicode61 remove_diacritics 2", prefix='2 3'
+    )
+    """,
+    """
+    INSERT INTO product_search_fts (rowid, name, tag, description, compound, product_id, language_code)
+    SELECT id, name, tag, description, compound, master_id, language_code
+    FROM product_product_translation
+    """,
+]
+SQLITE_DROP = ['DROP TABLE IF EXISTS product_search_fts']
+
+POSTGRES_CREATE = [
+    """
+    CREATE TABLE IF NOT EXISTS product_search_document (
+        translation_id bigint PRIMARY KEY,
+        product_id bigint NOT NULL,
+        language_code varchar(15) NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS product_search_document_document ON product_search_document USING GIN (document)',
+    'CREATE INDEX IF NOT EXISTS product_search_document_product ON product_search_document (product_id)',
+    """
+    INSERT INTO product_search_document (translation_id, product_id, language_code, document)
+    SELECT id, master_id, language_code,
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(tag, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+        || setweight(to_tsvector('simple', coalesce(compound, '')), 'D')
+    FROM product_product_translation
+    ON CONFLICT (translation_id) DO NOTHING
+    """,
+]
+POSTGRES_DROP = ['DROP TABLE IF EXISTS product_search_document']
+
+
+def run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0011_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_CREATE, 'postgresql': POSTGRES_CREATE}),
+            run({'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}),
+        ),
+    ]
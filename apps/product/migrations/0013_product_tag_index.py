@@ -0,0 +1,77 @@
+# Generated by Django 4.1.7 on 2026-10-18 11:25
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# The parsing of apps.product.tags at the time of this migration, inlined
+# so later changes to it cannot change what the backfill does.
+TAG_SEPARATORS = re.compile(r'[,;#\n]+')
+TAG_MAX_LENGTH = 100
+
+
+def parse_tags(text):
+    if not text:
+        return set()
+    tags = (' '.join(tag.casefold().split())[:TAG_MAX_LENGTH] for tag in TAG_SEPARATORS.split(text))
+    return {tag for tag in tags if tag}
+
+
+def backfill_tags(apps, schema_editor):
+    Translation = apps.get_model('product', 'ProductTranslation')
+    Tag = apps.get_model('product', 'Tag')
+    ProductTag = apps.get_model('product', 'ProductTag')
+
+    pairs = {}
+    for product_id, text in Translation.objects.values_list('master_id', 'tag').iterator():
+        pairs.setdefault(product_id, set()).update(parse_tags(text))
+
+    tags = {}
+    for names in pairs.values():
+        for name in names:
+            if name not in tags:
+                tags[name] = Tag.objects.get_or_create(name=name)[0]
+    for product_id, names in pairs.items():
+        for name in names:
+            ProductTag.objects.create(product_id=product_id, tag=tags[name])
+            tags[name].product_count += 1
+    for tag in tags.values():
+        tag.save(update_fields=['product_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0012_product_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Name')),
+                ('product_count', models.PositiveIntegerField(db_index=True, default=0)),
+            ],
+            options={
+                'verbose_name': 'Tag',
+                'verbose_name_plural': 'Tags',
+                'ordering': ['-product_count', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_tags', to='product.product')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_tags', to='product.tag')),
+            ],
+            options={
+                'verbose_name': 'Product Tag',
+                'verbose_name_plural': 'Product Tags',
+                'unique_together': {('tag', 'product')},
+            },
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
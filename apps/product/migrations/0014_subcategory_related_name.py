@@ -0,0 +1,19 @@
+# Generated by Django 4.1.7 on 2026-10-18 11:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0013_product_tag_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='subcategory',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subcategories', to='product.category', verbose_name='Parent Category'),
+        ),
+    ]
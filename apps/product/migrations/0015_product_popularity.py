@@ -0,0 +1,43 @@
+# Generated by Django 4.1.7 on 2026-10-18 11:35
+
+import datetime
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# The scoring of core.popularity at the time of this migration, inlined
+# so later changes to it cannot change what the backfill does.
+POPULARITY_EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+POPULARITY_HALF_LIFE = datetime.timedelta(days=7)
+
+
+def decay_factor(when):
+    return 2 ** (((when or timezone.now()) - POPULARITY_EPOCH) / POPULARITY_HALF_LIFE)
+
+
+def backfill_popularity(apps, schema_editor):
+    Product = apps.get_model('product', 'Product')
+    ProductRating = apps.get_model('product', 'ProductRating')
+
+    scores = defaultdict(float)
+    for product_id, star, review_date in ProductRating.objects.values_list('product_id', 'star', 'review_date'):
+        scores[product_id] += max(star, 0) * decay_factor(review_date)
+    for product_id, score in scores.items():
+        Product.objects.filter(pk=product_id).update(popularity=score)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0014_subcategory_related_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='popularity',
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_popularity, migrations.RunPython.noop),
+    ]
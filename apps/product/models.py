@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
 from parler.models import TranslatableModel, TranslatedFields
@@ -10,6 +10,7 @@ class Category(TranslatableModel):
         name=models.CharField(max_length=255, verbose_name=_('Name')),
     )
     image = models.ImageField(upload_to='category_images', verbose_name=_('Rasm'))
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
 
     def __str__(self):
@@ -29,6 +30,7 @@ class Company(TranslatableModel):
     location = models.CharField(max_length=255, null=True, blank=True)
     country = models.CharField(max_length=100, choices=Country.choices)
     image = models.ImageField(upload_to='post_images', verbose_name=_('Rasm'))
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     phone_number = PhoneNumberField(verbose_name=_('Phone number'))
     created_at = models.DateTimeField(auto_now_add=True)
     facebook = models.URLField(verbose_name=_('Facebook URL'), blank=True)
@@ -48,7 +50,9 @@ class SubCategory(TranslatableModel):
     translations = TranslatedFields(
         name=models.CharField(max_length=255, verbose_name=_('Name')),
     )
-    category = models.ForeignKey(Category, on_delete=models.CASCADE, verbose_name=_('Parent Category'))
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name='subcategories', verbose_name=_('Parent Category')
+    )
     is_active = models.BooleanField(default=True)
 
     def __str__(self):
@@ -71,6 +75,11 @@ class Product(TranslatableModel):
     created_at = models.DateTimeField(verbose_name=_('Created at'))
     updated_at = models.DateTimeField(verbose_name=_('Updated at'))
     is_featured = models.BooleanField(default=False, verbose_name=_('Maxus post'))
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.IntegerField(default=0, editable=False)
+    rating_average = models.FloatField(default=0, db_index=True, editable=False)
+    rating_histogram = models.JSONField(default=dict, blank=True, editable=False)
+    popularity = models.FloatField(default=0, db_index=True, editable=False)
 
     def __str__(self):
         return self.name
@@ -81,9 +90,36 @@ class Product(TranslatableModel):
         ordering = ['-created_at']
 
 
+class Tag(models.Model):
+    name = models.CharField(max_length=100, unique=True, verbose_name=_('Name'))
+    product_count = models.PositiveIntegerField(default=0, db_index=True)
+
+    class Meta:
+        verbose_name = _('Tag')
+        verbose_name_plural = _('Tags')
+        ordering = ['-product_count', 'name']
+
+    def __str__(self):
+        return self.name
+
+
+class ProductTag(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='product_tags')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='product_tags')
+
+    class Meta:
+        verbose_name = _('Product Tag')
+        verbose_name_plural = _('Product Tags')
+        unique_together = [['tag', 'product']]
+
+    def __str__(self):
+        return f"{self.product_id} - {self.tag.name}"
+
+
 class ProductImage(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='product_images')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return f"Image for {self.product.name}"
@@ -91,7 +127,7 @@ class ProductImage(models.Model):
 
 class ProductRating(models.Model):
     name = models.CharField(max_length=123, help_text="Nomi")
-    star = models.IntegerField(default=0, verbose_name="star")
+    star = models.IntegerField(default=0, verbose_name="star", db_index=True)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='productreview')
     review_comment = models.TextField()
     review_date = models.DateTimeField(auto_now_add=True, verbose_name='review_created_date')
@@ -104,6 +140,21 @@ class ProductRating(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.star} stars"
 
+    def save(self, *args, **kwargs):
+        # The previous star is read under a row lock that is held until the
+        # post_save signal has moved the product aggregates, so concurrent
+        # edits of one rating apply their deltas one after the other.
+        with transaction.atomic():
+            self._previous_rating = None
+            if self.pk:
+                self._previous_rating = (
+                    ProductRating.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list('product_id', 'star')
+                    .first()
+                )
+            super().save(*args, **kwargs)
+
 
 class CompanyProduct(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='company_products')
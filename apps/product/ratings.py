@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Product, ProductRating
+
+REBUILD_BATCH_SIZE = 500
+
+
+def _aggregates(histogram):
+    count = sum(histogram.values())
+    total = sum(int(star) * n for star, n in histogram.items())
+    average = total / count if count else 0
+    return {
+        'rating_count': count,
+        'rating_sum': total,
+        'rating_average': average,
+        'rating_histogram': histogram,
+    }
+
+
+def apply_rating_change(product_id, removed_star=None, added_star=None):
+    """
+    Incrementally move one rating in or out of a product's aggregates.
+    """
+    with transaction.atomic():
+        product = (
+            Product.objects.select_for_update()
+            .filter(pk=product_id)
+            .only('rating_histogram')
+            .first()
+        )
+        if product is None:
+            # The product itself is being deleted.
+            return
+        histogram = dict(product.rating_histogram)
+        if removed_star is not None:
+            key = str(removed_star)
+            histogram[key] = histogram.get(key, 0) - 1
+            if histogram[key] <= 0:
+                del histogram[key]
+        if added_star is not None:
+            key = str(added_star)
+            histogram[key] = histogram.get(key, 0) + 1
+        Product.objects.filter(pk=product_id).update(**_aggregates(histogram))
+
+
+def rebuild_rating_aggregates(product_ids=None):
+    """
+    Recompute the aggregates from the ratings table with one grouped query.
+    Returns the number of products updated.
+    """
+    ratings = ProductRating.objects.all()
+    products = Product.objects.all()
+    if product_ids is not None:
+        ratings = ratings.filter(product_id__in=product_ids)
+        products = products.filter(pk__in=product_ids)
+
+    histograms = defaultdict(dict)
+    rows = ratings.order_by().values('product_id', 'star').annotate(n=Count('id'))
+    for row in rows.iterator():
+        histograms[row['product_id']][str(row['star'])] = row['n']
+
+    fields = ['rating_count', 'rating_sum', 'rating_average', 'rating_histogram']
+    updated = 0
+    batch = []
+    for product in products.only('pk').iterator(chunk_size=REBUILD_BATCH_SIZE):
+        for field, value in _aggregates(histograms.get(product.pk, {})).items():
+            setattr(product, field, value)
+        batch.append(product)
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            updated += Product.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        updated += Product.objects.bulk_update(batch, fields)
+    return updated
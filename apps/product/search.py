@@ -0,0 +1,205 @@
+"""
+Full-text search over the product translations of every language.
+
+SQLite uses an FTS5 virtual table and PostgreSQL a weighted tsvector table
+with a GIN index. The tables are created by migration 0012 and kept in sync
+from the ProductTranslation signals. On any other database, or when the
+index table is missing, searches fall back to `icontains` lookups.
+
+Indexed searches return at most `MAX_RESULTS` products, the best ranked
+ones; pagination only walks within them.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, When, Value, FloatField, Q
+
+from .models import Product
+
+SQLITE_TABLE = 'product_search_fts'
+POSTGRES_TABLE = 'product_search_document'
+MAX_TOKENS = 8
+MAX_RESULTS = 250
+
+# name, tag, description, compound
+COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5(
+        name, tag, description, compound,
+        product_id UNINDEXED, language_code UNINDEXED,
+        tokenize="unicode61 remove_diacritics 2", prefix='2 3'
+    )
+    """,
+]
+SQLITE_DROP = [f'DROP TABLE IF EXISTS {SQLITE_TABLE}']
+
+POSTGRES_CREATE = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} (
+        translation_id bigint PRIMARY KEY,
+        product_id bigint NOT NULL,
+        language_code varchar(15) NOT NULL,
+        document tsvector NOT NULL
+    )
+    """,
+    f'CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_document ON {POSTGRES_TABLE} USING GIN (document)',
+    f'CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_product ON {POSTGRES_TABLE} (product_id)',
+]
+POSTGRES_DROP = [f'DROP TABLE IF EXISTS {POSTGRES_TABLE}']
+
+
+def tokenize(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TOKENS]
+
+
+_available = {}
+
+
+def index_available():
+    if connection.vendor == 'sqlite':
+        table = SQLITE_TABLE
+    elif connection.vendor == 'postgresql':
+        table = POSTGRES_TABLE
+    else:
+        return False
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _available:
+        _available[key] = table in connection.introspection.table_names()
+    return _available[key]
+
+
+def index_translation(translation):
+    """
+    Insert or replace the index entry of one ProductTranslation row.
+    """
+    if not index_available():
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [translation.pk])
+            cursor.execute(
+                f'INSERT INTO {SQLITE_TABLE} '
+                '(rowid, name, tag, description, compound, product_id, language_code) '
+                'VALUES (%s, %s, %s, %s, %s, %s, %s)',
+                [
+                    translation.pk, translation.name, translation.tag, translation.description,
+                    translation.compound, translation.master_id, translation.language_code,
+                ],
+            )
+        else:
+            cursor.execute(
+                f'INSERT INTO {POSTGRES_TABLE} (translation_id, product_id, language_code, document) '
+                "VALUES (%s, %s, %s, setweight(to_tsvector('simple', %s), 'A') "
+                "|| setweight(to_tsvector('simple', %s), 'B') "
+                "|| setweight(to_tsvector('simple', %s), 'C') "
+                "|| setweight(to_tsvector('simple', %s), 'D')) "
+                'ON CONFLICT (translation_id) DO UPDATE SET '
+                'product_id = EXCLUDED.product_id, language_code = EXCLUDED.language_code, '
+                'document = EXCLUDED.document',
+                [
+                    translation.pk, translation.master_id, translation.language_code,
+                    translation.name, translation.tag, translation.description, translation.compound,
+                ],
+            )
+
+
+def remove_translation(translation_id):
+    if not index_available():
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [translation_id])
+        else:
+            cursor.execute(f'DELETE FROM {POSTGRES_TABLE} WHERE translation_id = %s', [translation_id])
+
+
+def rebuild_index(product_ids=None, batch_size=500):
+    """
+    Reindex the translations of `product_ids`, or of every product.
+    Returns the number of translations indexed.
+    """
+    if not index_available():
+        return 0
+    table = SQLITE_TABLE if connection.vendor == 'sqlite' else POSTGRES_TABLE
+    translations = Product._parler_meta.root.model.objects.order_by('pk')
+    with connection.cursor() as cursor:
+        if product_ids is None:
+            cursor.execute(f'DELETE FROM {table}')
+        else:
+            translations = translations.filter(master_id__in=product_ids)
+            for start in range(0, len(product_ids), batch_size):
+                chunk = list(product_ids[start:start + batch_size])
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f'DELETE FROM {table} WHERE product_id IN ({placeholders})', chunk)
+
+    indexed = 0
+    for translation in translations.iterator(chunk_size=batch_size):
+        index_translation(translation)
+        indexed += 1
+    return indexed
+
+
+def search_product_ids(query, limit=MAX_RESULTS):
+    """
+    Return `[(product_id, rank), ...]` best match first. Every query token
+    is a prefix match and all tokens must match within one translation.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+            match = ' '.join(f'"{token}"*' for token in tokens)
+            # bm25() cannot be aggregated, so collapse languages here.
+            cursor.execute(
+                f'SELECT product_id, bm25({SQLITE_TABLE}, {weights}) AS score FROM {SQLITE_TABLE} '
+                f'WHERE {SQLITE_TABLE} MATCH %s ORDER BY score LIMIT %s',
+                [match, limit * 3],
+            )
+            results = {}
+            for product_id, score in cursor.fetchall():
+                results.setdefault(int(product_id), -score)
+            return list(results.items())[:limit]
+
+        match = ' & '.join(f'{token}:*' for token in tokens)
+        cursor.execute(
+            f"SELECT product_id, max(ts_rank(document, to_tsquery('simple', %s))) AS rank "
+            f"FROM {POSTGRES_TABLE} WHERE document @@ to_tsquery('simple', %s) "
+            'GROUP BY product_id ORDER BY rank DESC LIMIT %s',
+            [match, match, limit],
+        )
+        return [(product_id, rank) for product_id, rank in cursor.fetchall()]
+
+
+def filter_by_search(queryset, query):
+    """
+    Restrict `queryset` to the products matching `query`, ordered by rank.
+    With the index, only the `MAX_RESULTS` best matches are kept, so deeper
+    matches are never listed; the `icontains` fallback has no cap.
+    """
+    if not index_available():
+        condition = Q()
+        for token in tokenize(query) or [query]:
+            condition &= (
+                Q(translations__name__icontains=token)
+                | Q(translations__tag__icontains=token)
+                | Q(translations__description__icontains=token)
+                | Q(translations__compound__icontains=token)
+            )
+        return queryset.filter(pk__in=Product.objects.filter(condition).values('pk'))
+
+    ranked = search_product_ids(query)
+    if not ranked:
+        return queryset.none()
+    rank = Case(
+        *[When(pk=product_id, then=Value(score)) for product_id, score in ranked],
+        output_field=FloatField(),
+    )
+    return (
+        queryset.filter(pk__in=[product_id for product_id, score in ranked])
+        .annotate(search_rank=rank)
+        .order_by('-search_rank', '-pk')
+    )
@@ -1,6 +1,16 @@
+from django.db.models import F, JSONField, Subquery, OuterRef
 from rest_framework import serializers
 from parler_rest.serializers import TranslatableModelSerializer
 from parler_rest.fields import TranslatedFieldsField
+
+from core.serializers import (
+    CompactTranslationsMixin,
+    ImageVariantsField,
+    OptionalFieldsMixin,
+    SparseFieldsetMixin,
+    StorageURLField,
+)
+from core.translations import translated_subquery
 from .models import (
     Company,
     Product,
@@ -9,13 +19,13 @@ from .models import (
     Category,
     SubCategory,
     ProductImage,
+    Tag,
     Application,
     Question,
 )
-from django.db.models import Avg
 
 
-class SubCategorySerializer(TranslatableModelSerializer):
+class SubCategorySerializer(CompactTranslationsMixin, TranslatableModelSerializer):
     translations = TranslatedFieldsField(shared_model=SubCategory)
 
     class Meta:
@@ -23,8 +33,9 @@ class SubCategorySerializer(TranslatableModelSerializer):
         fields = '__all__'
 
 
-class CategorySerializer(TranslatableModelSerializer):
+class CategorySerializer(CompactTranslationsMixin, TranslatableModelSerializer):
     translations = TranslatedFieldsField(shared_model=Category)
+    image_variants = ImageVariantsField()
     subcategories = SubCategorySerializer(many=True, read_only=True)
 
     class Meta:
@@ -32,40 +43,40 @@ class CategorySerializer(TranslatableModelSerializer):
         fields = '__all__'
         ref_name = 'CategorySerializer'
 
-    def get_subcategory(self, category_instance):
-        subcategories = SubCategory.objects.filter(category=category_instance)
-        serializer = SubCategorySerializer(subcategories, many=True)
-        return serializer.data
-
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = ProductImage
         fields = '__all__'
 
 
-class ProductSerializer(TranslatableModelSerializer):
+class ProductSerializer(CompactTranslationsMixin, TranslatableModelSerializer):
     translations = TranslatedFieldsField(shared_model=Product)
     category = SubCategorySerializer(read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
 
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['popularity']
 
 
-class CompanySerializer(TranslatableModelSerializer):
+class CompanySerializer(OptionalFieldsMixin, CompactTranslationsMixin, TranslatableModelSerializer):
     translations = TranslatedFieldsField(shared_model=Company)
+    image_variants = ImageVariantsField()
     products = serializers.SerializerMethodField()
     type_product = CategorySerializer(read_only=True)
 
     class Meta:
         model = Company
         fields = '__all__'
+        optional_fields = ['products']
 
     def get_products(self, instance):
-        products = Product.objects.filter(campany=instance)
-        product_serializer = ProductSerializer(products, many=True)
+        # Filled for the whole page by CompanyViewSet with one prefetch.
+        products = getattr(instance, 'included_products', [])
+        product_serializer = ProductSerializer(products, many=True, context=self.context)
         return product_serializer.data
 
 
@@ -84,7 +95,39 @@ class CompanyProductSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ProductRetrieveSerializer(TranslatableModelSerializer):
+class ProductListSerializer(SparseFieldsetMixin, serializers.Serializer):
+    """
+    Compact catalog grid item, rendered from `.values()` rows instead of
+    model instances.
+    """
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    image = StorageURLField()
+    image_variants = ImageVariantsField()
+    company_name = serializers.CharField(read_only=True)
+    category_id = serializers.IntegerField(read_only=True)
+    rating_average = serializers.FloatField(read_only=True)
+    rating_count = serializers.IntegerField(read_only=True)
+
+    def get_values(self, queryset, extra_columns=()):
+        """
+        Select only the columns of the (possibly sparse) fieldset, plus
+        `extra_columns` needed by the paginator.
+        """
+        first_image = ProductImage.objects.filter(product=OuterRef('pk')).order_by('pk')
+        expressions = {
+            'name': translated_subquery(Product, 'name'),
+            'image': Subquery(first_image.values('image')[:1]),
+            'image_variants': Subquery(first_image.values('image_variants')[:1], output_field=JSONField()),
+            'company_name': F('company__name'),
+        }
+        columns = [name for name in self.fields if name not in expressions]
+        columns += [name for name in extra_columns if name not in columns and name not in expressions]
+        annotations = {name: expressions[name] for name in self.fields if name in expressions}
+        return queryset.values(*columns, **annotations)
+
+
+class ProductRetrieveSerializer(SparseFieldsetMixin, CompactTranslationsMixin, TranslatableModelSerializer):
     translations = TranslatedFieldsField(shared_model=Product)
     product_reviews = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
@@ -97,13 +140,20 @@ class ProductRetrieveSerializer(TranslatableModelSerializer):
         return review_ser.data
 
     def get_average_rating(self, instance):
-        ratings = ProductRating.objects.filter(product=instance)
-        avg_rating = ratings.aggregate(Avg('star'))['star__avg']
-        return avg_rating
+        if not instance.rating_count:
+            return None
+        return instance.rating_average
 
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['popularity']
+        prefetch_related = {'product_reviews': ['productreview']}
+
+
+class TagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = ['id', 'name', 'product_count']
 
 
 class ApplicationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.db.models import F
+from django.dispatch import receiver
+
+from apps.sms.outbox import enqueue
+from core.images import watch_images
+from core.popularity import add_popularity
+from core.response_cache import watch_models
+from . import search
+from .facets import invalidate_facets
+from .models import (
+    Application,
+    Category,
+    SubCategory,
+    Company,
+    Product,
+    ProductImage,
+    ProductRating,
+    ProductTag,
+    Question,
+    Tag,
+)
+from .ratings import apply_rating_change
+from .tags import schedule_tag_sync
+
+ProductTranslation = Product._parler_meta.root.model
+
+
+@receiver(post_save, sender=ProductRating)
+def update_rating_aggregates(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_rating', None)
+    if previous is None:
+        apply_rating_change(instance.product_id, added_star=instance.star)
+        add_popularity(Product, instance.product_id, max(instance.star, 0))
+        return
+    product_id, star = previous
+    if product_id == instance.product_id:
+        if star != instance.star:
+            apply_rating_change(product_id, removed_star=star, added_star=instance.star)
+        return
+    apply_rating_change(product_id, removed_star=star)
+    apply_rating_change(instance.product_id, added_star=instance.star)
+
+
+def _deleting_product(origin):
+    return isinstance(origin, Product) or getattr(origin, 'model', None) is Product
+
+
+@receiver(post_delete, sender=ProductRating)
+def remove_rating_aggregates(sender, instance, origin=None, **kwargs):
+    if not _deleting_product(origin):
+        apply_rating_change(instance.product_id, removed_star=instance.star)
+
+
+@receiver(post_save, sender=ProductTranslation)
+def index_product_translation(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_translation(instance)
+        schedule_tag_sync(instance.master_id)
+
+
+@receiver(post_delete, sender=ProductTranslation)
+def unindex_product_translation(sender, instance, origin=None, **kwargs):
+    search.remove_translation(instance.pk)
+    if not _deleting_product(origin):
+        schedule_tag_sync(instance.master_id)
+
+
+@receiver(post_delete, sender=ProductTag)
+def decrement_tag_count(sender, instance, **kwargs):
+    Tag.objects.filter(pk=instance.tag_id).update(product_count=F('product_count') - 1)
+
+
+APPLICATION_RECEIVED = "Arizangiz qabul qilindi. Tez orada siz bilan bog'lanamiz."
+QUESTION_RECEIVED = "Savolingiz qabul qilindi. Tez orada siz bilan bog'lanamiz."
+
+
+@receiver(post_save, sender=Application)
+def notify_application(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        enqueue(instance.phone_number, APPLICATION_RECEIVED)
+        enqueue(
+            settings.SMS_NOTIFY_NUMBERS,
+            f'Yangi ariza: {instance.company_name}, {instance.name}, {instance.phone_number}',
+        )
+
+
+@receiver(post_save, sender=Question)
+def notify_question(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        enqueue(instance.phone_number, QUESTION_RECEIVED)
+        enqueue(settings.SMS_NOTIFY_NUMBERS, f'Yangi savol: {instance.name}, {instance.phone_number}')
+
+
+FACET_MODELS = [
+    Category, Category._parler_meta.root.model,
+    SubCategory, SubCategory._parler_meta.root.model,
+    Company,
+    Product, ProductTranslation,
+    ProductRating,
+    ProductTag,
+]
+
+
+def catalog_changed(sender, **kwargs):
+    invalidate_facets()
+
+
+for model in FACET_MODELS:
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f'facets-{model._meta.label}-save')
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f'facets-{model._meta.label}-delete')
+
+
+watch_models(Category, SubCategory, Company, Product, ProductImage, ProductRating)
+watch_images(Category, Company, ProductImage)
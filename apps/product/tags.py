@@ -0,0 +1,166 @@
+import re
+import weakref
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count, F
+
+from .models import Product, Tag, ProductTag
+
+TAG_SEPARATORS = re.compile(r'[,;#\n]+')
+TAG_MAX_LENGTH = Tag._meta.get_field('name').max_length
+
+
+def normalize_tag(value):
+    return ' '.join(value.casefold().split())[:TAG_MAX_LENGTH]
+
+
+def parse_tags(text):
+    """
+    Split the free-text `tag` field into a set of normalized tag names.
+    """
+    if not text:
+        return set()
+    return {tag for tag in map(normalize_tag, TAG_SEPARATORS.split(text)) if tag}
+
+
+def _get_or_create_tags(names, batch_size=500):
+    names = sorted(names)
+    Tag.objects.bulk_create([Tag(name=name) for name in names], batch_size=batch_size, ignore_conflicts=True)
+    tag_ids = {}
+    for start in range(0, len(names), batch_size):
+        chunk = names[start:start + batch_size]
+        tag_ids.update(Tag.objects.filter(name__in=chunk).values_list('name', 'pk'))
+    return tag_ids
+
+
+def _insert_product_tags(product_id, tag_ids):
+    """
+    Insert the missing rows of one product and return the tag ids that
+    were actually inserted; rows a concurrent sync added are skipped.
+    """
+    values = ', '.join(['(%s, %s)'] * len(tag_ids))
+    params = [value for tag_id in tag_ids for value in (product_id, tag_id)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {ProductTag._meta.db_table} (product_id, tag_id) VALUES {values} '
+            'ON CONFLICT (tag_id, product_id) DO NOTHING RETURNING tag_id',
+            params,
+        )
+        return [tag_id for tag_id, in cursor.fetchall()]
+
+
+def sync_product_tags(product_id):
+    """
+    Bring the tag rows of one product in line with its translations.
+    Only the difference is written; counts move with F() updates.
+    """
+    translations = Product._parler_meta.root.model.objects.filter(master_id=product_id)
+    wanted = set()
+    for text in translations.values_list('tag', flat=True):
+        wanted |= parse_tags(text)
+
+    with transaction.atomic():
+        current = dict(
+            ProductTag.objects.filter(product_id=product_id).values_list('tag__name', 'pk')
+        )
+        removed = [pk for name, pk in current.items() if name not in wanted]
+        added = wanted - set(current)
+
+        if removed:
+            # Counts are decremented by the ProductTag post_delete signal.
+            ProductTag.objects.filter(pk__in=removed).delete()
+        if added and Product.objects.filter(pk=product_id).exists():
+            inserted = _insert_product_tags(product_id, sorted(_get_or_create_tags(added).values()))
+            Tag.objects.filter(pk__in=inserted).update(product_count=F('product_count') + 1)
+
+
+class _TagSync:
+    """
+    The on_commit callback of one product. Queued callbacks are kept in
+    a weak dictionary, so one dropped by a rollback leaves it as well.
+    """
+
+    def __init__(self, pending, product_id):
+        self.pending = pending
+        self.product_id = product_id
+
+    def __call__(self):
+        self.pending.pop(self.product_id, None)
+        sync_product_tags(self.product_id)
+
+
+def schedule_tag_sync(product_id):
+    """
+    Sync the tags of a product once the transaction commits. Saving a
+    product saves each of its translations, the sync runs once for all.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(connection, 'pending_tag_syncs', None)
+    if pending is None:
+        pending = connection.pending_tag_syncs = weakref.WeakValueDictionary()
+    if product_id in pending:
+        return
+    callback = pending[product_id] = _TagSync(pending, product_id)
+    transaction.on_commit(callback)
+
+
+def add_product_tags(translations):
+    """
+    Create the tag rows of freshly bulk-inserted products from their
+    translations, without going through the per-product signals.
+    """
+    names_by_product = defaultdict(set)
+    for translation in translations:
+        names_by_product[translation.master_id] |= parse_tags(translation.tag)
+    tag_ids = _get_or_create_tags({name for names in names_by_product.values() for name in names})
+    ProductTag.objects.bulk_create([
+        ProductTag(product_id=product_id, tag_id=tag_ids[name])
+        for product_id, names in names_by_product.items()
+        for name in names
+    ])
+    counts = defaultdict(int)
+    for names in names_by_product.values():
+        for name in names:
+            counts[tag_ids[name]] += 1
+    tags_by_count = defaultdict(list)
+    for tag_id, count in counts.items():
+        tags_by_count[count].append(tag_id)
+    for count, ids in tags_by_count.items():
+        Tag.objects.filter(pk__in=ids).update(product_count=F('product_count') + count)
+
+
+def rebuild_tag_index(batch_size=500):
+    """
+    Rebuild every product-tag row from the translations and recount.
+    Returns the number of product-tag rows written.
+    """
+    Translation = Product._parler_meta.root.model
+    with transaction.atomic():
+        # Skip the per-row post_delete signal, the counts are rebuilt below.
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {ProductTag._meta.db_table}')
+
+        pairs = defaultdict(set)
+        rows = Translation.objects.order_by('master_id').values_list('master_id', 'tag')
+        for product_id, text in rows.iterator(chunk_size=batch_size):
+            pairs[product_id] |= parse_tags(text)
+
+        tag_ids = _get_or_create_tags({name for names in pairs.values() for name in names})
+        ProductTag.objects.bulk_create(
+            [
+                ProductTag(product_id=product_id, tag_id=tag_ids[name])
+                for product_id, names in pairs.items()
+                for name in names
+            ],
+            batch_size=batch_size,
+        )
+
+        counts = dict(
+            ProductTag.objects.order_by().values('tag_id').annotate(n=Count('id')).values_list('tag_id', 'n')
+        )
+        tags = list(Tag.objects.only('pk'))
+        for tag in tags:
+            tag.product_count = counts.get(tag.pk, 0)
+        Tag.objects.bulk_update(tags, ['product_count'], batch_size=batch_size)
+    return sum(len(names) for names in pairs.values())
@@ -1,3 +1,771 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone, translation
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.images import build_variants
+from core.paginations import KeysetPagination
+from core.popularity import add_popularity, current_score
+from core.query_planning import active_translations_prefetch
+from core.serializers import StorageURLField
+from core.testing import QueryBudgetTestCase
+from core.translations import FALLBACK_MISSES, load_translations
+from .models import Category, SubCategory, Company, Product, ProductImage, ProductRating, ProductTag, Tag
+from .tags import _insert_product_tags, schedule_tag_sync
+from .views import product_views
+
+
+class CatalogFixturesMixin:
+    def create_catalog(self):
+        self.category = Category.objects.create(name='Food', image='category_images/food.jpg')
+        self.subcategory = SubCategory.objects.create(name='Dairy', category=self.category)
+        self.company = Company.objects.create(
+            name='Acme',
+            description='About Acme',
+            type_product=self.category,
+            country='UZ',
+            image='post_images/acme.jpg',
+            phone_number='+998901234567',
+        )
+
+    def create_product(self, name='Milk', **kwargs):
+        now = timezone.now()
+        product = Product(
+            category=kwargs.pop('category', self.subcategory),
+            company=kwargs.pop('company', self.company),
+            created_at=now,
+            updated_at=now,
+            **kwargs,
+        )
+        for language in ('uz', 'en', 'ru'):
+            product.set_current_language(language)
+            product.name = f'{name} {language}'
+            product.description = f'{name} description'
+            product.compound = f'{name} compound'
+            product.tag = 'dairy, fresh'
+        product.save()
+        ProductImage.objects.create(product=product, image=f'product_images/{product.pk}.jpg')
+        for star in (3, 5):
+            ProductRating.objects.create(
+                name='Buyer', star=star, product=product, review_comment='ok', email='buyer@example.com',
+            )
+        return product
+
+
+class ProductQueryBudgetTests(CatalogFixturesMixin, QueryBudgetTestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.product = self.create_product()
+
+    def grow(self):
+        for index in range(5):
+            self.create_product(name=f'Product {index}')
+
+    def test_product_list(self):
+        self.assertQueryBudget('/product/products/', 2, grow=self.grow)
+
+    def test_product_detail(self):
+        self.assertQueryBudget(f'/product/products/{self.product.pk}/', 6)
+
+    def test_category_list(self):
+        self.assertQueryBudget('/product/category/', 5)
+
+    def test_subcategory_list(self):
+        self.assertQueryBudget('/product/subcategory/', 3)
+
+    def test_company_list_with_products(self):
+        self.assertQueryBudget('/product/company/?include=products', 9, grow=self.grow)
+
+    def test_sparse_detail(self):
+        self.assertQueryBudget(f'/product/products/{self.product.pk}/?fields=id,average_rating', 2)
+
+    def test_average_rating(self):
+        response = self.client.get(f'/product/products/{self.product.pk}/')
+        self.assertEqual(response.json()['average_rating'], 4)
+
+
+class CompanyProductsTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.products = [self.create_product(name=f'Product {index}') for index in range(3)]
+
+    def test_products_are_opt_in(self):
+        company = self.client.get('/product/company/').json()['results'][0]
+        self.assertNotIn('products', company)
+
+    def test_products_are_capped_per_company(self):
+        response = self.client.get('/product/company/', {'include': 'products', 'products_limit': 2})
+        products = response.json()['results'][0]['products']
+        self.assertEqual([item['id'] for item in products], [self.products[2].pk, self.products[1].pk])
+
+
+class RatingAggregateTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.product = self.create_product()
+
+    def assertAggregates(self, count, total, histogram):
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.rating_count, count)
+        self.assertEqual(self.product.rating_sum, total)
+        self.assertEqual(self.product.rating_histogram, histogram)
+        self.assertEqual(self.product.rating_average, total / count if count else 0)
+
+    def test_incremental_maintenance(self):
+        self.assertAggregates(2, 8, {'3': 1, '5': 1})
+        rating = self.product.productreview.get(star=3)
+        rating.star = 4
+        rating.save()
+        self.assertAggregates(2, 9, {'4': 1, '5': 1})
+        rating.delete()
+        self.assertAggregates(1, 5, {'5': 1})
+
+    def test_stale_instances(self):
+        first = self.product.productreview.get(star=3)
+        second = ProductRating.objects.get(pk=first.pk)
+        first.star = 4
+        first.save()
+        second.star = 1
+        second.save()
+        self.assertAggregates(2, 6, {'1': 1, '5': 1})
+
+    def test_rebuild_command(self):
+        Product.objects.filter(pk=self.product.pk).update(rating_count=0, rating_sum=0, rating_histogram={})
+        call_command('rebuild_rating_aggregates', stdout=StringIO())
+        self.assertAggregates(2, 8, {'3': 1, '5': 1})
+
+    def test_min_rating_filter(self):
+        self.create_product(name='Unrated').productreview.all().delete()
+        response = self.client.get('/product/products/', {'min_rating': 4})
+        self.assertEqual([item['id'] for item in response.json()['results']], [self.product.pk])
+
+
+class PopularityTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        # The fixture images are not on disk, their variants fail.
+        with self.assertLogs('core.images', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            self.milk = self.create_product(name='Milk')
+            self.kefir = self.create_product(name='Kefir')
+
+    def popular(self):
+        response = self.client.get('/product/products/', {'popular': 'true', 'fields': 'id'})
+        return [item['id'] for item in response.json()['results']]
+
+    def test_ratings_and_views_raise_popularity(self):
+        self.assertEqual(self.popular(), [self.kefir.pk, self.milk.pk])
+        ProductRating.objects.create(
+            name='Buyer', star=5, product=self.milk, review_comment='ok', email='buyer@example.com',
+        )
+        self.assertEqual(self.popular(), [self.milk.pk, self.kefir.pk])
+
+        product_views.pending.clear()
+        for address in ('10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.3'):
+            self.client.get(f'/product/products/{self.kefir.pk}/', REMOTE_ADDR=address)
+        product_views.flush()
+        self.kefir.refresh_from_db()
+        self.assertAlmostEqual(current_score(self.kefir.popularity), 8 + 3, places=3)
+
+    def test_cached_ranking_follows_views(self):
+        url = '/product/products/?popular=true&fields=id'
+        first = self.client.get(url)
+        self.assertEqual(self.popular(), [self.kefir.pk, self.milk.pk])
+        product_views.pending.clear()
+        product_views.last_bump = None
+        self.client.get(f'/product/products/{self.milk.pk}/', REMOTE_ADDR='10.0.1.1', HTTP_USER_AGENT='ranking')
+        product_views.flush()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+        self.assertEqual(self.popular(), [self.milk.pk, self.kefir.pk])
+
+    def test_rating_refreshes_cached_ranking(self):
+        first = self.client.get('/product/products/?popular=true')
+        add_popularity(Product, self.milk.pk, 1)
+        response = self.client.get('/product/products/?popular=true', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+
+class ProductListTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.product = self.create_product()
+
+    def test_compact_list_item(self):
+        item = self.client.get('/product/products/', HTTP_ACCEPT_LANGUAGE='uz').json()['results'][0]
+        self.assertEqual(item, {
+            'id': self.product.pk,
+            'name': 'Milk uz',
+            'image': f'http://testserver/media/product_images/{self.product.pk}.jpg',
+            'image_variants': None,
+            'company_name': 'Acme',
+            'category_id': self.subcategory.pk,
+            'rating_average': 4.0,
+            'rating_count': 2,
+        })
+
+    def test_sparse_fieldset(self):
+        response = self.client.get('/product/products/', {'fields': 'id,rating_count'})
+        self.assertEqual(response.json()['results'], [{'id': self.product.pk, 'rating_count': 2}])
+
+
+class ProductSearchTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.milk = self.create_product(name='Milk')
+        self.butter = self.create_product(name='Butter')
+        self.butter.set_current_language('ru')
+        self.butter.description = 'Made from milk'
+        self.butter.tag = 'сливочное'
+        self.butter.save()
+
+    def search(self, query):
+        response = self.client.get('/product/products/', {'search': query, 'fields': 'id'})
+        return [item['id'] for item in response.json()['results']]
+
+    def test_prefix_match_ranks_name_first(self):
+        self.assertEqual(self.search('mil'), [self.milk.pk, self.butter.pk])
+
+    def test_tag_match(self):
+        self.assertEqual(self.search('сливоч'), [self.butter.pk])
+
+    def test_index_follows_translation_changes(self):
+        self.milk.set_current_language('en')
+        self.milk.name = 'Kefir'
+        self.milk.save()
+        self.assertEqual(self.search('kefir'), [self.milk.pk])
+        self.milk.delete()
+        self.assertEqual(self.search('kefir'), [])
+
+
+class TagIndexTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        # The fixture images are not on disk, their variants fail.
+        with self.assertLogs('core.images', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+            self.milk = self.create_product(name='Milk')
+            self.kefir = self.create_product(name='Kefir')
+
+    def tag_counts(self):
+        return {item['name']: item['product_count'] for item in self.client.get('/product/tags/').json()}
+
+    def test_tag_filter_and_facet(self):
+        self.assertEqual(self.tag_counts(), {'dairy': 2, 'fresh': 2})
+        response = self.client.get('/product/products/', {'tag': ' Dairy ', 'fields': 'id'})
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_incremental_maintenance(self):
+        for language in ('uz', 'en', 'ru'):
+            self.kefir.set_current_language(language)
+            self.kefir.tag = '#dairy #Sour'
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.kefir.save()
+        # One sync for the product, not one per translation.
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.tag_counts(), {'dairy': 2, 'fresh': 1, 'sour': 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.delete()
+        self.assertEqual(self.tag_counts(), {'dairy': 1, 'sour': 1})
+
+    def test_rolled_back_sync_is_scheduled_again(self):
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                schedule_tag_sync(self.kefir.pk)
+                raise DatabaseError
+        with self.captureOnCommitCallbacks() as callbacks:
+            schedule_tag_sync(self.kefir.pk)
+            schedule_tag_sync(self.kefir.pk)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_insert_skips_existing_rows(self):
+        # A concurrent sync may insert rows between the read and the insert.
+        dairy, fresh = Tag.objects.get(name='dairy'), Tag.objects.get(name='fresh')
+        ProductTag.objects.filter(product=self.kefir, tag=fresh).delete()
+        inserted = _insert_product_tags(self.kefir.pk, [dairy.pk, fresh.pk])
+        self.assertEqual(inserted, [fresh.pk])
+        self.assertEqual(ProductTag.objects.filter(product=self.kefir).count(), 2)
+
+    def test_rebuild_command(self):
+        Tag.objects.update(product_count=0)
+        call_command('rebuild_tag_index', stdout=StringIO())
+        self.assertEqual(self.tag_counts(), {'dairy': 2, 'fresh': 2})
+
+
+class FacetTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.other_company = Company.objects.create(
+            name='Globex',
+            description='About Globex',
+            type_product=self.category,
+            country='KZ',
+            image='post_images/globex.jpg',
+            phone_number='+77001234567',
+        )
+        self.create_product(name='Milk')
+        self.create_product(name='Cheese', is_featured=True)
+        self.create_product(name='Kumis', company=self.other_company)
+
+    def facet(self, facets, name):
+        return {item['value']: item['count'] for item in facets['facets'][name]}
+
+    def test_counts_exclude_own_filter(self):
+        facets = self.client.get('/product/products/facets/', {'country': 'UZ'}).json()
+        self.assertEqual(facets['count'], 2)
+        self.assertEqual(self.facet(facets, 'country'), {'UZ': 2, 'KZ': 1})
+        self.assertEqual(self.facet(facets, 'featured'), {True: 1, False: 1})
+        self.assertEqual(self.facet(facets, 'company'), {self.company.pk: 2})
+        self.assertEqual(facets['facets']['country'][0]['label'], 'Uzbekistan')
+
+    def test_invalid_filter(self):
+        response = self.client.get('/product/products/facets/', {'category': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.json())
+
+    def test_cache_is_invalidated(self):
+        self.client.get('/product/products/facets/')
+        self.create_product(name='Yogurt')
+        facets = self.client.get('/product/products/facets/').json()
+        self.assertEqual(facets['count'], 4)
+        self.assertEqual(self.facet(facets, 'parent_category'), {self.category.pk: 4})
+
+    def test_cached_query_count(self):
+        self.client.get('/product/products/facets/')
+        with self.assertNumQueries(0):
+            self.client.get('/product/products/facets/')
+
+
+class ResponseCacheTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.product = self.create_product()
+        self.url = f'/product/products/{self.product.pk}/'
+
+    def test_hit_only_checks_validators(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=0)
+    def test_timeout_setting(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+    def test_malformed_pk(self):
+        self.assertEqual(self.client.get('/product/products/abc/').status_code, 404)
+
+    def test_key_includes_origin(self):
+        first = self.client.get(self.url, HTTP_HOST='shop.example.com')
+        response = self.client.get(self.url, HTTP_HOST='api.example.com', secure=True)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertTrue(response.json()['images'][0]['image'].startswith('https://api.example.com/'))
+
+    def test_translation_edit_invalidates(self):
+        self.client.get(self.url, HTTP_ACCEPT_LANGUAGE='en')
+        self.product.set_current_language('en')
+        self.product.name = 'Fresh milk'
+        self.product.save()
+        response = self.client.get(self.url, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['name'], 'Fresh milk')
+
+    def test_rating_invalidates_list(self):
+        self.client.get('/product/products/')
+        ProductRating.objects.create(
+            name='Buyer', star=1, product=self.product, review_comment='bad', email='buyer@example.com',
+        )
+        response = self.client.get('/product/products/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['rating_count'], 3)
+
+
+class LanguageNegotiationTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.product = self.create_product()
+        self.url = f'/product/products/{self.product.pk}/'
+
+    def test_query_parameter_wins(self):
+        response = self.client.get(self.url, {'lang': 'ru'}, HTTP_ACCEPT_LANGUAGE='en')
+        self.assertEqual(response['Content-Language'], 'ru')
+        self.assertEqual(response.json()['name'], 'Milk ru')
+        self.assertNotIn('translations', response.json())
+
+    def test_accept_language(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_LANGUAGE='de, en-GB;q=0.8, ru;q=0.5')
+        self.assertEqual(response['Content-Language'], 'en')
+        self.assertEqual(response.json()['name'], 'Milk en')
+
+    def test_fallback(self):
+        self.product.translations.filter(language_code='ru').delete()
+        response = self.client.get(self.url, {'lang': 'ru'})
+        self.assertEqual(response.json()['name'], 'Milk uz')
+
+    def test_all_languages_opt_in(self):
+        data = self.client.get(self.url, {'lang': 'all'}).json()
+        self.assertNotIn('name', data)
+        self.assertEqual(data['translations']['ru']['name'], 'Milk ru')
+
+    def test_one_translation_per_object(self):
+        self.product.translations.filter(language_code='en').delete()
+        with translation.override('en'):
+            products = Product.objects.prefetch_related(active_translations_prefetch(Product))
+            loaded = [row.language_code for row in products[0].translations.all()]
+        self.assertEqual(loaded, ['uz'])
+
+
+class ConditionalGetTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.product = self.create_product()
+        self.url = f'/product/products/{self.product.pk}/'
+
+    def test_etag_short_circuits(self):
+        response = self.client.get('/product/products/')
+        with self.assertNumQueries(1):
+            response = self.client.get('/product/products/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_no_last_modified(self):
+        # updated_at does not move with deletes or translation edits.
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        self.product.translations.filter(language_code='ru').delete()
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_with_data(self):
+        etag = self.client.get(self.url)['ETag']
+        self.product.set_current_language('en')
+        self.product.name = 'Fresh milk'
+        self.product.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_category_etag_without_timestamps(self):
+        etag = self.client.get('/product/category/')['ETag']
+        self.assertEqual(self.client.get('/product/category/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        SubCategory.objects.create(name='Bakery', category=self.category)
+        self.assertEqual(self.client.get('/product/category/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class CategoryTreeTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.create_product()
+        self.create_product(name='Kefir')
+        SubCategory.objects.create(name='Hidden', category=self.category, is_active=False)
+        Category.objects.create(name='Archived', image='category_images/old.jpg', is_active=False)
+
+    def test_tree(self):
+        language = self.category.get_current_language()
+        with self.assertNumQueries(5):
+            tree = self.client.get('/product/category/tree/').json()
+        self.assertEqual(tree, [{
+            'id': self.category.pk,
+            'image': 'http://testserver/media/category_images/food.jpg',
+            'translations': {language: {'name': 'Food'}},
+            'product_count': 2,
+            'subcategories': [{
+                'id': self.subcategory.pk,
+                'translations': {language: {'name': 'Dairy'}},
+                'product_count': 2,
+            }],
+        }])
+
+    def test_snapshot_is_reused_and_rebuilt(self):
+        etag = self.client.get('/product/category/tree/')['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/product/category/tree/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        SubCategory.objects.create(name='Bakery', category=self.category)
+        tree = self.client.get('/product/category/tree/').json()
+        self.assertEqual(len(tree[0]['subcategories']), 2)
+
+    def test_snapshot_per_origin(self):
+        etag = self.client.get('/product/category/tree/')['ETag']
+        response = self.client.get('/product/category/tree/', HTTP_IF_NONE_MATCH=etag, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['image'], 'https://testserver/media/category_images/food.jpg')
+
+
+class ImageVariantTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root, IMAGE_DERIVATIVE_WORKERS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.create_catalog()
+
+    def upload(self, name, width=800, height=600):
+        buffer = BytesIO()
+        Image.new('RGB', (width, height), 'red').save(buffer, 'JPEG')
+        return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    def test_variants_on_upload(self):
+        product = self.create_product()
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(product=product, image=self.upload('product_images/photo.jpg'))
+        image.refresh_from_db()
+        sizes = image.image_variants['sizes']
+        self.assertEqual([(size, variant['width']) for size, variant in sizes.items()], [('small', 200), ('medium', 480)])
+        self.assertTrue(default_storage.exists(sizes['small']['webp']))
+        self.assertRegex(sizes['small']['jpeg'], r'^derivatives/product_images/photo\.small\.[0-9a-f]{16}\.jpeg$')
+
+        item = self.client.get('/product/products/', {'fields': 'id,image_variants'}).json()['results'][0]
+        self.assertEqual(item['image_variants'], None)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductImage.objects.filter(product=product).exclude(pk=image.pk).delete()
+        item = self.client.get('/product/products/', {'fields': 'id,image_variants'}).json()['results'][0]
+        self.assertTrue(item['image_variants']['srcset_webp'].endswith(' 480w'))
+
+    def test_unreadable_image(self):
+        image = self.create_product().images.get()
+        with self.assertLogs('core.images', 'ERROR') as logs:
+            self.assertIsNone(build_variants(ProductImage, image.pk))
+        self.assertIn(f'Could not render derivatives of {image.image.name}', logs.output[0])
+        image.refresh_from_db()
+        self.assertEqual(image.image_variants, {})
+
+    def test_backfill_command(self):
+        Category.objects.filter(pk=self.category.pk).update(image=self.upload('category_images/food.jpg', 150, 150))
+        Company.objects.update(image='')
+        call_command('build_image_variants', workers=0, stdout=StringIO())
+        self.category.refresh_from_db()
+        self.assertEqual(list(self.category.image_variants['sizes']), ['small'])
+
+
+class ProductTransferTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, text):
+        path = f'{self.directory}/{name}'
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def test_import_with_errors_and_resume(self):
+        path = self.write('products.csv', (
+            'company,category,is_featured,name_en,description_en,compound_en,tag_en,images\n'
+            f'Acme,{self.subcategory.pk},true,Yogurt,Plain,Milk,"dairy, sour",product_images/a.jpg|product_images/b.jpg\n'
+            f'Nobody,{self.subcategory.pk},,Ghost,Boo,Air,,\n'
+            f'{self.company.pk},{self.subcategory.pk},,Ayran,Salty,Milk,dairy,\n'
+        ))
+        stderr = StringIO()
+        call_command('import_products', path, chunk_size=1, stdout=StringIO(), stderr=stderr)
+        self.assertIn("line 3: unknown company 'Nobody'", stderr.getvalue())
+
+        yogurt = Product.objects.get(translations__name='Yogurt')
+        self.assertTrue(yogurt.is_featured)
+        self.assertEqual(yogurt.images.count(), 2)
+        self.assertEqual(Tag.objects.get(name='dairy').product_count, 2)
+        response = self.client.get('/product/products/', {'search': 'ayran', 'fields': 'id'})
+        self.assertEqual(len(response.json()['results']), 1)
+
+        call_command('import_products', path, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_malformed_images(self):
+        base = {'company': self.company.pk, 'category': self.subcategory.pk, 'name_en': 'Kefir',
+                'description_en': 'Sour', 'compound_en': 'Milk'}
+        rows = [dict(base, images=3), dict(base, images=[1]), dict(base, images=['product_images/k.jpg'])]
+        path = self.write('products.jsonl', ''.join(json.dumps(row) + '\n' for row in rows))
+        stderr = StringIO()
+        call_command('import_products', path, stdout=StringIO(), stderr=stderr)
+        self.assertIn('line 1: images must be a string or a list of strings', stderr.getvalue())
+        self.assertIn('line 2: images must be a string or a list of strings', stderr.getvalue())
+        self.assertEqual(Product.objects.get().images.get().image.name, 'product_images/k.jpg')
+
+    def test_export_round_trip(self):
+        self.create_product()
+        path = f'{self.directory}/products.jsonl'
+        call_command('export_products', path)
+        with open(path) as file:
+            row = json.loads(file.readline())
+        self.assertEqual(row['name_uz'], 'Milk uz')
+        self.assertEqual(len(row['images']), 1)
+        call_command('import_products', path, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Product.objects.filter(translations__name='Milk ru').count(), 2)
+
+
+class TranslationLoaderTests(CatalogFixturesMixin, QueryBudgetTestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.create_product()
+        User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.login(username='admin', password='secret')
+
+    def grow(self):
+        for index in range(5):
+            self.create_product(name=f'Product {index}')
+
+    def test_product_changelist(self):
+        queries = self.count_queries('/admin/product/product/')
+        self.assertQueryBudget('/admin/product/product/', queries, grow=self.grow)
+
+    def test_rating_changelist(self):
+        queries = self.count_queries('/admin/product/productrating/')
+        self.assertQueryBudget('/admin/product/productrating/', queries, grow=self.grow)
+
+    def test_fallback_from_one_query(self):
+        products = list(Product.objects.language('de').all())
+        FALLBACK_MISSES.clear()
+        with self.assertNumQueries(1):
+            load_translations(products)
+            self.assertEqual([product.name for product in products], ['Milk uz'])
+        self.assertEqual(FALLBACK_MISSES['product.Product'], 1)
+
+
+class KeysetPaginationTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_catalog()
+        self.products = [self.create_product(name=f'Product {index}') for index in range(5)]
+        # Equal timestamps exercise the id tie breaker.
+        Product.objects.update(updated_at=self.products[0].updated_at)
+
+    def walk(self, url, key='next'):
+        ids = []
+        pages = 0
+        while url:
+            page = self.client.get(url).json()
+            ids.extend(item['id'] for item in page['results'])
+            url = page['links'][key]
+            pages += 1
+        return ids, pages
+
+    def test_walks_every_row_once(self):
+        ids, pages = self.walk('/product/products/?page_size=2&fields=id')
+        self.assertEqual(ids, sorted((product.pk for product in self.products), reverse=True))
+        self.assertEqual(pages, 3)
+
+    def test_previous_link(self):
+        first = self.client.get('/product/products/?page_size=2&fields=id').json()
+        self.assertIsNone(first['links']['previous'])
+        second = self.client.get(first['links']['next']).json()
+        back = self.client.get(second['links']['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['links']['previous'])
+
+    def test_total_is_optional(self):
+        self.assertIsNone(self.client.get('/product/products/').json()['total'])
+        self.assertEqual(self.client.get('/product/products/?with_total=true').json()['total'], 5)
+
+    def test_ratings_keep_star_ordering(self):
+        ids, pages = self.walk('/product/product-ratings/?page_size=3')
+        self.assertEqual(len(ids), 10)
+        stars = list(ProductRating.objects.filter(pk__in=ids[:5]).values_list('star', flat=True))
+        self.assertEqual(stars, [5] * 5)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/product/products/?cursor=nope').status_code, 404)
+        # Well-formed, but the values do not fit the ordering columns.
+        cursor = KeysetPagination().encode_cursor(['bad', 1])
+        self.assertEqual(self.client.get(f'/product/products/?cursor={cursor}').status_code, 404)
+
+
+class AuthenticationTests(CatalogFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('staff', 'staff@example.com', 'secret', is_staff=True)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_cached_user_skips_query(self):
+        self.assertEqual(self.client.get('/task-stats/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/task-stats/').status_code, 200)
+
+    def test_save_drops_snapshot(self):
+        self.client.get('/task-stats/')
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get('/task-stats/').status_code, 403)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/task-stats/').status_code, 401)
+
+    def test_public_endpoints_ignore_credentials(self):
+        self.create_catalog()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(self.client.get('/product/products/').status_code, 200)
+        self.assertEqual(self.client.get('/product/category/').status_code, 200)
+        self.assertEqual(self.client.get('/task-stats/').status_code, 401)
+
+
+class MediaTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.name = default_storage.save('product_images/notes.txt', ContentFile(b'0123456789abcdef'))
+        self.url = default_storage.url(self.name)
+
+    def test_hashed_name_cached_forever(self):
+        self.assertRegex(self.name, r'^product_images/notes\.[0-9a-f]{16}\.txt$')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.getvalue(), b'0123456789abcdef')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/media/product_images/missing.txt').status_code, 404)
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+
+    def test_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/16')
+        self.assertEqual(response.getvalue(), b'2345')
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=-3').getvalue(), b'def')
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=16-').status_code, 416)
+        stale = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"other"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_empty_file_ranges(self):
+        url = default_storage.url(default_storage.save('product_images/empty.txt', ContentFile(b'')))
+        for header in ('bytes=0-', 'bytes=-1'):
+            response = self.client.get(url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response['Content-Range'], 'bytes */0')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_storage_url_field_takes_files(self):
+        field = StorageURLField()
+        image = ProductImage(image=self.name).image
+        self.assertEqual(field.to_representation(image), default_storage.url(self.name))
+        self.assertIsNone(field.to_representation(ProductImage().image))
+
+    def test_signed_urls(self):
+        with override_settings(MEDIA_URL_SIGNING=True, MEDIA_BASE_URL='https://cdn.example.com'):
+            url = default_storage.url(self.name)
+            self.assertTrue(url.startswith(f'https://cdn.example.com/media/{self.name}?sig='))
+            path = url[len('https://cdn.example.com'):]
+            self.assertEqual(self.client.get(path).status_code, 200)
+            self.assertEqual(self.client.get(f'/media/{self.name}').status_code, 404)
+            self.assertEqual(self.client.get(f'/media/{self.name}?sig=0').status_code, 404)
+        self.assertEqual(default_storage.url(self.name), f'/media/{self.name}')
+
+    def test_sendfile(self):
+        with override_settings(MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+        self.assertEqual(response.content, b'')
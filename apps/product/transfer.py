@@ -0,0 +1,258 @@
+"""
+Streaming product import and export in CSV or JSON lines.
+
+Every row is one product with flat columns:
+
+    company, category, is_featured, created_at, updated_at,
+    name_<lang>, description_<lang>, compound_<lang>, tag_<lang> (per language),
+    images (storage paths separated by `|`, or a list in JSON lines)
+
+`company` is a company id or exact name, `category` a subcategory id.
+Rows are read one at a time and written in chunks with `bulk_create`, so
+memory stays bounded by the chunk size. After each chunk the last
+committed line is stored in a progress file, from which an interrupted
+import can resume.
+"""
+import csv
+import json
+import os
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache_versions import bump_version
+from core.response_cache import model_version_name
+from . import search
+from .facets import invalidate_facets
+from .models import Company, Product, ProductImage, SubCategory
+from .tags import add_product_tags
+
+LANGUAGES = [language['code'] for language in settings.PARLER_LANGUAGES[None]]
+TRANSLATED_FIELDS = ['name', 'description', 'compound', 'tag']
+REQUIRED_TRANSLATED_FIELDS = ['name', 'description', 'compound']
+COLUMNS = (
+    ['company', 'category', 'is_featured', 'created_at', 'updated_at']
+    + [f'{field}_{language}' for language in LANGUAGES for field in TRANSLATED_FIELDS]
+    + ['images']
+)
+IMAGE_SEPARATOR = '|'
+CHUNK_SIZE = 500
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+ProductTranslation = Product._parler_meta.root.model
+
+
+class RowError(Exception):
+    def __init__(self, line, errors):
+        super().__init__(f'line {line}: ' + '; '.join(errors))
+        self.line = line
+        self.errors = errors
+
+
+def guess_format(path):
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def read_rows(file, format='csv'):
+    """
+    Yield `(line, row)` from an open text file without loading it whole.
+    """
+    if format == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line, text in enumerate(file, start=1):
+        if text.strip():
+            try:
+                yield line, json.loads(text)
+            except ValueError as error:
+                yield line, RowError(line, [f'invalid JSON: {error}'])
+
+
+class ProductImporter:
+    """
+    Validate rows and write them in chunks. `errors` collects a
+    `RowError` per rejected row.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE, progress_path=None):
+        self.chunk_size = chunk_size
+        self.progress_path = progress_path
+        self.companies_by_name = dict(Company.objects.values_list('name', 'pk'))
+        self.company_ids = set(self.companies_by_name.values())
+        self.category_ids = set(SubCategory.objects.values_list('pk', flat=True))
+        self.errors = []
+        self.imported = 0
+        self.now = timezone.now()
+
+    def get_resume_line(self):
+        if not self.progress_path or not os.path.exists(self.progress_path):
+            return 0
+        with open(self.progress_path) as file:
+            return int(file.read().strip() or 0)
+
+    def save_progress(self, line):
+        if self.progress_path:
+            with open(self.progress_path, 'w') as file:
+                file.write(str(line))
+
+    def _company(self, value, errors):
+        value = str(value or '').strip()
+        if value.isdigit() and int(value) in self.company_ids:
+            return int(value)
+        if value in self.companies_by_name:
+            return self.companies_by_name[value]
+        errors.append(f'unknown company {value!r}')
+
+    def _category(self, value, errors):
+        value = str(value or '').strip()
+        if value.isdigit() and int(value) in self.category_ids:
+            return int(value)
+        errors.append(f'unknown subcategory {value!r}')
+
+    def _datetime(self, row, name, errors):
+        value = row.get(name)
+        if not value:
+            return self.now
+        parsed = parse_datetime(str(value))
+        if parsed is None:
+            errors.append(f'invalid {name} {value!r}')
+            return None
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def validate(self, line, row):
+        """
+        Turn one row into `(product, translations, images)` or raise `RowError`.
+        """
+        if not isinstance(row, dict):
+            raise RowError(line, ['row is not an object'])
+        errors = []
+        product = Product(
+            company_id=self._company(row.get('company'), errors),
+            category_id=self._category(row.get('category'), errors),
+            is_featured=str(row.get('is_featured') or '').strip().lower() in TRUE_VALUES,
+            created_at=self._datetime(row, 'created_at', errors),
+            updated_at=self._datetime(row, 'updated_at', errors),
+        )
+
+        translations = []
+        for language in LANGUAGES:
+            values = {field: str(row.get(f'{field}_{language}') or '').strip() for field in TRANSLATED_FIELDS}
+            if not any(values.values()):
+                continue
+            for field in REQUIRED_TRANSLATED_FIELDS:
+                if not values[field]:
+                    errors.append(f'{field}_{language} is required')
+            for field, value in values.items():
+                max_length = ProductTranslation._meta.get_field(field).max_length
+                if max_length and len(value) > max_length:
+                    errors.append(f'{field}_{language} is longer than {max_length} characters')
+            translations.append(ProductTranslation(language_code=language, **values))
+        if not translations:
+            errors.append('at least one translation is required')
+
+        images = row.get('images') or []
+        if isinstance(images, str):
+            images = images.split(IMAGE_SEPARATOR)
+        if not isinstance(images, list) or not all(isinstance(name, str) for name in images):
+            errors.append('images must be a string or a list of strings')
+            images = []
+        images = [ProductImage(image=name.strip()) for name in images if name.strip()]
+
+        if errors:
+            raise RowError(line, errors)
+        return product, translations, images
+
+    def write_chunk(self, chunk):
+        with transaction.atomic():
+            products = Product.objects.bulk_create([product for product, translations, images in chunk])
+            translation_rows, image_rows = [], []
+            for product, (_, translations, images) in zip(products, chunk):
+                for translation in translations:
+                    translation.master_id = product.pk
+                    translation_rows.append(translation)
+                for image in images:
+                    image.product_id = product.pk
+                    image_rows.append(image)
+            ProductTranslation.objects.bulk_create(translation_rows)
+            ProductImage.objects.bulk_create(image_rows)
+            add_product_tags(translation_rows)
+        # bulk_create sends no signals, so index and invalidate here.
+        search.rebuild_index([product.pk for product in products])
+        return len(products)
+
+    def run(self, rows):
+        resume_line = self.get_resume_line()
+        chunk = []
+        last_line = resume_line
+        for line, row in rows:
+            if line <= resume_line:
+                continue
+            last_line = line
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                chunk.append(self.validate(line, row))
+            except RowError as error:
+                self.errors.append(error)
+            if len(chunk) >= self.chunk_size:
+                self.imported += self.write_chunk(chunk)
+                self.save_progress(last_line)
+                chunk = []
+        if chunk:
+            self.imported += self.write_chunk(chunk)
+        self.save_progress(last_line)
+        if self.imported:
+            invalidate_facets()
+            for model in (Product, ProductImage):
+                bump_version(model_version_name(model))
+        return self.imported
+
+
+def export_rows(queryset=None, chunk_size=CHUNK_SIZE):
+    """
+    Yield one dict per product in the import format.
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+    queryset = queryset.order_by('pk').prefetch_related('translations', 'images')
+    for product in queryset.iterator(chunk_size=chunk_size):
+        row = {
+            'company': product.company_id,
+            'category': product.category_id,
+            'is_featured': product.is_featured,
+            'created_at': product.created_at.isoformat(),
+            'updated_at': product.updated_at.isoformat(),
+        }
+        for translation in product.translations.all():
+            if translation.language_code in LANGUAGES:
+                for field in TRANSLATED_FIELDS:
+                    row[f'{field}_{translation.language_code}'] = getattr(translation, field)
+        row['images'] = [image.image.name for image in product.images.all()]
+        yield row
+
+
+def _csv_line(values):
+    class Line:
+        def write(self, value):
+            return value
+    return csv.writer(Line()).writerow(values)
+
+
+def export_lines(queryset=None, format='csv', chunk_size=CHUNK_SIZE):
+    """
+    Yield the export as text lines, header first for CSV.
+    """
+    if format == 'csv':
+        yield _csv_line(COLUMNS)
+    for row in export_rows(queryset, chunk_size):
+        if format == 'csv':
+            row['images'] = IMAGE_SEPARATOR.join(row['images'])
+            yield _csv_line([row.get(column, '') for column in COLUMNS])
+        else:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
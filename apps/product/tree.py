@@ -0,0 +1,88 @@
+import hashlib
+from collections import defaultdict
+from urllib.parse import urljoin
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models import Count
+
+from core.cache_versions import get_versions
+from core.response_cache import model_version_name
+from .models import Category, SubCategory, Product
+
+TREE_CACHE_TIMEOUT = 60 * 60 * 24
+TREE_MODELS = [Category, SubCategory, Product]
+
+
+def _translations(model, ids):
+    translations = defaultdict(dict)
+    rows = model._parler_meta.root.model.objects.filter(master_id__in=ids).values_list(
+        'master_id', 'language_code', 'name'
+    )
+    for master_id, language_code, name in rows:
+        translations[master_id][language_code] = {'name': name}
+    return translations
+
+
+def build_category_tree(origin=''):
+    """
+    Active categories with their active subcategories, the names in every
+    language and product counts per node, in five queries. Image URLs are
+    made absolute with `origin` (`https://host`).
+    """
+    categories = list(Category.objects.filter(is_active=True).order_by('pk').values('id', 'image'))
+    category_ids = [category['id'] for category in categories]
+    subcategories = list(
+        SubCategory.objects.filter(is_active=True, category_id__in=category_ids)
+        .order_by('pk')
+        .values('id', 'category_id')
+    )
+    subcategory_ids = [subcategory['id'] for subcategory in subcategories]
+    product_counts = dict(
+        Product.objects.filter(category_id__in=subcategory_ids)
+        .order_by()
+        .values('category_id')
+        .annotate(n=Count('pk'))
+        .values_list('category_id', 'n')
+    )
+    category_names = _translations(Category, category_ids)
+    subcategory_names = _translations(SubCategory, subcategory_ids)
+
+    children = defaultdict(list)
+    for subcategory in subcategories:
+        children[subcategory['category_id']].append({
+            'id': subcategory['id'],
+            'translations': subcategory_names[subcategory['id']],
+            'product_count': product_counts.get(subcategory['id'], 0),
+        })
+    return [
+        {
+            'id': category['id'],
+            'image': urljoin(origin, default_storage.url(category['image'])) if category['image'] else None,
+            'translations': category_names[category['id']],
+            'product_count': sum(child['product_count'] for child in children[category['id']]),
+            'subcategories': children[category['id']],
+        }
+        for category in categories
+    ]
+
+
+def get_tree_version():
+    versions = get_versions([model_version_name(model) for model in TREE_MODELS])
+    return hashlib.md5('.'.join(map(str, versions)).encode()).hexdigest()
+
+
+def get_category_tree(origin=''):
+    """
+    Return `(version, tree)` with image URLs absolute for `origin`. The
+    snapshot is stored under the versions of the category, subcategory and
+    product models and the origin, so any change to them has it rebuilt
+    on the next read.
+    """
+    version = hashlib.md5(f'{get_tree_version()}|{origin}'.encode()).hexdigest()
+    key = f'category-tree:{version}'
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_category_tree(origin)
+        cache.set(key, tree, TREE_CACHE_TIMEOUT)
+    return version, tree
@@ -1,6 +1,6 @@
 from django.urls import include, path
 from rest_framework import routers
-from .views import CompanyViewSet, ProductViewSet, ProductRatingViewSet, CategoryViewSet, SubCategoryViewSet, ApplicationViewSet, QuestionViewSet
+from .views import CompanyViewSet, ProductViewSet, ProductRatingViewSet, CategoryViewSet, SubCategoryViewSet, TagViewSet, ApplicationViewSet, QuestionViewSet
 from .views import GetCSRFToken
 
 router = routers.DefaultRouter()
@@ -9,6 +9,7 @@ router.register(r'products', ProductViewSet)
 router.register(r'product-ratings', ProductRatingViewSet)
 router.register(r'category', CategoryViewSet)
 router.register(r'subcategory', SubCategoryViewSet)
+router.register(r'tags', TagViewSet)
 router.register(r'applications', ApplicationViewSet)
 router.register(r'questions', QuestionViewSet)
 
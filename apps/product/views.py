@@ -2,31 +2,52 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework import views, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.filters import SearchFilter
+from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from django.db.models import F
+from django.db.models import F, OuterRef, Prefetch, Subquery
+from django.utils.cache import get_conditional_response
+from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
+
+from core.paginations import KeysetPagination
+from core.conditional import ConditionalGetMixin
+from core.counters import get_visitor
+from core.popularity import PopularityCounter
+from core.query_planning import QueryPlanMixin, ValuesListMixin, plan_queryset
+from core.response_cache import CachedResponseMixin
+from core.serializers import get_requested_includes
 
 from .models import (
     Category,
     SubCategory,
     Product,
     Company,
+    ProductImage,
     ProductRating,
+    Tag,
     Application,
     Question,
 )
+from .facets import get_facets
 from .filters import ProductFilter
+from .tags import normalize_tag
+from .tree import get_category_tree
 from .serializers import (
     CategorySerializer,
     SubCategorySerializer,
+    ProductListSerializer,
     ProductRetrieveSerializer,
+    ProductSerializer,
     CompanySerializer,
     ProductRatingSerializer,
+    TagSerializer,
     ApplicationSerializer,
     QuestionSerializer,
 )
 
+product_views = PopularityCounter(Product, dedupe_window=60 * 60 * 24)
+
 
 class GetCSRFToken(views.APIView):
     permission_classes = [AllowAny]
@@ -39,26 +60,46 @@ class GetCSRFToken(views.APIView):
         return Response("CSRF token obtained successfully.")
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing categories.
     """
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_models = [Category, SubCategory]
     http_method_names = ["get", "head", "options"]
+    authentication_classes = []
 
+    @action(detail=False, methods=["get"])
+    def tree(self, request):
+        """
+        Active categories with their active subcategories and product
+        counts, in every language.
+        """
+        version, tree = get_category_tree(f"{request.scheme}://{request.get_host()}")
+        etag = f'"{version}"'
+        if get_conditional_response(request, etag=etag) is not None:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(tree)
+        response["ETag"] = etag
+        return response
 
-class SubCategoryViewSet(viewsets.ModelViewSet):
+
+class SubCategoryViewSet(ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing subcategories.
     """
 
     queryset = SubCategory.objects.all()
     serializer_class = SubCategorySerializer
+    cache_models = [SubCategory]
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(
+    ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, ValuesListMixin, viewsets.ModelViewSet
+):
     """
     API endpoint for managing products.
     """
@@ -66,26 +107,78 @@ class ProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all().order_by("-updated_at")
     serializer_class = ProductRetrieveSerializer
     http_method_names = ["get", "head", "options"]
+    authentication_classes = []
     filterset_class = ProductFilter
-    filter_backends = [SearchFilter]
-    search_fields = ["translations__name"]
-    ordering_fields = ["created_at", "name", "type_product"]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    ordering_fields = ["created_at", "updated_at", "rating_average", "rating_count"]
+    pagination_class = KeysetPagination
+    cache_models = [Product, ProductImage, ProductRating, SubCategory, Company]
 
     def get_serializer_class(self):
-        if self.action == "retrieve":
-            return ProductRetrieveSerializer
+        if self.action == "list":
+            return ProductListSerializer
         return super().get_serializer_class()
 
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            product_views.record(int(kwargs[self.lookup_field]), get_visitor(request))
+        return response
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """
+        Product counts per subcategory, parent category, company, country
+        and featured flag for the current filter state.
+        """
+        # Invalid filters are rejected like on the list, not ignored.
+        filterset = ProductFilter(request.query_params, queryset=Product.objects.none())
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        return Response(get_facets(request.query_params))
+
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing companies.
+
+    `?include=products` adds each company's newest products, at most
+    `products_per_company` of them (`?products_limit=` lowers the cap).
     """
 
-    queryset = Company.objects.all()
+    queryset = Company.objects.all().order_by("-created_at")
     serializer_class = CompanySerializer
+    pagination_class = KeysetPagination
     filter_backends = [SearchFilter]
     search_fields = ["translations__name"]
+    products_per_company = 10
+
+    def get_products_limit(self):
+        try:
+            limit = int(self.request.query_params["products_limit"])
+        except (KeyError, ValueError):
+            return self.products_per_company
+        return max(1, min(limit, self.products_per_company))
+
+    def get_products_prefetch(self):
+        """
+        One query for the products of every company on the page; the cap
+        is a correlated LIMIT subquery, so each company gets its own top N.
+        """
+        newest = (
+            Product.objects.filter(company=OuterRef("company"))
+            .order_by("-updated_at", "-pk")
+            .values("pk")[: self.get_products_limit()]
+        )
+        products = Product.objects.filter(pk__in=Subquery(newest)).order_by("-updated_at", "-pk")
+        products = plan_queryset(products, ProductSerializer(context=self.get_serializer_context()))
+        return Prefetch("product_set", queryset=products, to_attr="included_products")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request is not None and "products" in get_requested_includes(self.request):
+            queryset = queryset.prefetch_related(self.get_products_prefetch())
+        return queryset
 
 
 class ProductRatingViewSet(viewsets.ModelViewSet):
@@ -95,6 +188,31 @@ class ProductRatingViewSet(viewsets.ModelViewSet):
 
     queryset = ProductRating.objects.all().order_by(F("star").desc())
     serializer_class = ProductRatingSerializer
+    pagination_class = KeysetPagination
+
+
+class TagViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Tag facet: tags with their product counts, most used first.
+    Filter by name prefix with `?q=`.
+    """
+
+    queryset = Tag.objects.filter(product_count__gt=0)
+    serializer_class = TagSerializer
+    authentication_classes = []
+    max_tags = 100
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        q = self.request.query_params.get("q")
+        if q:
+            queryset = queryset.filter(name__startswith=normalize_tag(q))
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()[: self.max_tags]
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
 
 
 class ApplicationViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from core.admin import OutboxAdmin
+from .models import Message
+
+
+@admin.register(Message)
+class MessageAdmin(OutboxAdmin):
+    list_display = ['phone_number', 'status', 'attempts', 'created_at', 'sent_at']
+    search_fields = ['phone_number', 'text']
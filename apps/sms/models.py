@@ -0,0 +1,20 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from core.outbox import OutboxModel
+
+
+class Message(OutboxModel):
+    phone_number = models.CharField(max_length=20, help_text="Telefon raqami")
+    text = models.TextField(help_text="Matn")
+
+    class Meta:
+        verbose_name = _('SMS')
+        verbose_name_plural = _('SMS')
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='sms_message_due_idx'),
+            models.Index(fields=['claim'], name='sms_message_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.phone_number}: {self.text[:30]}'
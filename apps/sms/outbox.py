@@ -0,0 +1,135 @@
+"""
+Durable SMS outbox.
+
+`enqueue` only inserts rows, so request handlers never wait on the SMS
+provider. Once the transaction commits, the `send_sms` task sends the
+due messages; a periodic run of the same task (or the `send_sms`
+command) picks up retries and anything a crashed worker left behind.
+
+Each round claims up to `SMS_CONCURRENCY * BATCH_SIZE` due messages. It
+sends them as batches of `BATCH_SIZE` through the `SMS_PROVIDER`, with at
+most `SMS_CONCURRENCY` batches in flight and at most `SMS_RATE_LIMIT`
+messages per second. Failed messages are retried with backoff (see
+`core.outbox`).
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from core.eskiz import SMSError
+from core.outbox import claim_due, record_results
+from .models import Message
+from .providers import get_provider
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+
+
+def normalize_phone_number(value):
+    return ''.join(character for character in str(value or '') if character.isdigit())
+
+
+def enqueue(phone_numbers, text):
+    """
+    Queue `text` for one number or a list of numbers. Returns the messages.
+    """
+    if isinstance(phone_numbers, str):
+        phone_numbers = [phone_numbers]
+    numbers = {normalize_phone_number(number) for number in phone_numbers} - {''}
+    if not numbers:
+        return []
+    messages = Message.objects.bulk_create([Message(phone_number=number, text=text) for number in sorted(numbers)])
+    transaction.on_commit(wake_worker)
+    return messages
+
+
+class RateLimiter:
+    """
+    Token bucket shared by the sending threads; `rate` is per second and
+    0 disables the limit.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # A batch larger than the bucket waits for a full bucket.
+                needed = min(amount, self.capacity)
+                if self.tokens >= needed:
+                    self.tokens -= amount
+                    return
+                wait = (needed - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiter = None
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(getattr(settings, 'SMS_RATE_LIMIT', 5))
+    return _limiter
+
+
+def _send_batch(provider, limiter, batch):
+    limiter.acquire(len(batch))
+    try:
+        return provider.send_batch(batch) or {}
+    except SMSError as error:
+        return {message.pk: error for message in batch}
+    except Exception as error:
+        logger.exception('SMS provider failed')
+        return {message.pk: SMSError(str(error)) for message in batch}
+
+
+def dispatch(provider=None):
+    """
+    Send one round of due messages. Returns `(sent, failed)` counts.
+    """
+    concurrency = max(1, getattr(settings, 'SMS_CONCURRENCY', 2))
+    messages = claim_due(Message, concurrency * BATCH_SIZE)
+    if not messages:
+        return 0, 0
+    provider = provider or get_provider()
+    limiter = get_limiter()
+    batches = [messages[index:index + BATCH_SIZE] for index in range(0, len(messages), BATCH_SIZE)]
+    errors = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='sms') as executor:
+        for batch_errors in executor.map(lambda batch: _send_batch(provider, limiter, batch), batches):
+            errors.update(batch_errors)
+    record_results(messages, errors)
+    return len(messages) - len(errors), len(errors)
+
+
+def dispatch_pending(provider=None):
+    """
+    Send rounds until no message is due. Returns the number sent.
+    """
+    total = 0
+    while True:
+        sent, failed = dispatch(provider)
+        total += sent
+        if not sent and not failed:
+            return total
+
+
+def wake_worker():
+    from .tasks import send_sms
+    send_sms.delay()
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from core.eskiz import SMSError
+
+
+class FakeProvider:
+    """
+    Local provider for tests and development. Messages are recorded in
+    `sent` instead of being sent; numbers in `failing` get a retryable
+    error.
+    """
+    sent = []
+    failing = set()
+
+    def send_batch(self, messages):
+        errors = {}
+        for message in messages:
+            if message.phone_number in self.failing:
+                errors[message.pk] = SMSError(f'{message.phone_number} is unreachable')
+            else:
+                self.sent.append((message.phone_number, message.text))
+        return errors
+
+    @classmethod
+    def reset(cls):
+        cls.sent.clear()
+        cls.failing.clear()
+
+
+def get_provider():
+    """
+    Instantiate the `SMS_PROVIDER` class. Providers implement
+    `send_batch(messages)`, which raises `SMSError` when the whole batch
+    failed and returns `{message pk: SMSError}` for single failures.
+    """
+    return import_string(settings.SMS_PROVIDER)()
@@ -0,0 +1,93 @@
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.eskiz import TOKEN_CACHE_KEY, EskizClient, SMSError
+from core.outbox import MAX_ATTEMPTS
+from .models import Message
+from .outbox import dispatch, dispatch_pending, enqueue
+from .providers import FakeProvider
+
+
+@override_settings(
+    SMS_PROVIDER='apps.sms.providers.FakeProvider',
+    SMS_NOTIFY_NUMBERS=['+998 90 000 00 00'],
+    SMS_RATE_LIMIT=0,
+)
+class OutboxTests(TestCase):
+    def setUp(self):
+        FakeProvider.reset()
+        self.addCleanup(FakeProvider.reset)
+
+    def test_application_is_queued_not_sent(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/product/applications/', {
+                'name': 'Ali', 'location': 'UZ', 'phone_number': '+998 90 123-45-67', 'company_name': 'Acme',
+            })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(FakeProvider.sent, [])
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(
+            sorted(Message.objects.values_list('phone_number', 'status')),
+            [('998900000000', 'pending'), ('998901234567', 'pending')],
+        )
+
+        self.assertEqual(dispatch_pending(), 2)
+        self.assertEqual(Message.objects.filter(status=Message.SENT).count(), 2)
+        self.assertIn(('998900000000', 'Yangi ariza: Acme, Ali, +998 90 123-45-67'), FakeProvider.sent)
+
+    def test_retry_with_backoff(self):
+        message, = enqueue('998901112233', 'Hello')
+        FakeProvider.failing.add('998901112233')
+        self.assertEqual(dispatch(), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (Message.PENDING, 1))
+        self.assertGreater(message.next_attempt_at, timezone.now() + datetime.timedelta(seconds=25))
+        # Not due yet.
+        self.assertEqual(dispatch(), (0, 0))
+
+        Message.objects.update(next_attempt_at=timezone.now(), attempts=MAX_ATTEMPTS - 1)
+        dispatch()
+        message.refresh_from_db()
+        self.assertEqual(message.status, Message.FAILED)
+        self.assertIn('unreachable', message.last_error)
+
+    def test_permanent_error_is_not_retried(self):
+        provider = mock.Mock()
+        provider.send_batch.side_effect = SMSError('invalid number', status=400, retry=False)
+        enqueue('1', 'Hello')
+        self.assertEqual(dispatch(provider), (0, 1))
+        self.assertEqual(Message.objects.get().status, Message.FAILED)
+
+    def test_stale_claims_are_taken_over(self):
+        enqueue('998901112233', 'Hello')
+        Message.objects.update(status=Message.SENDING, claimed_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(dispatch(), (1, 0))
+
+
+class EskizClientTests(TestCase):
+    def setUp(self):
+        cache.delete(TOKEN_CACHE_KEY)
+        self.addCleanup(cache.delete, TOKEN_CACHE_KEY)
+
+    def response(self, status, data):
+        return mock.Mock(status_code=status, text='', json=mock.Mock(return_value=data))
+
+    def test_token_is_shared_and_renewed(self):
+        login = self.response(200, {'data': {'token': 'first'}})
+        sent = self.response(200, {'status': 'waiting'})
+        with mock.patch('requests.Session.post', side_effect=[login, sent, sent]) as post:
+            EskizClient('mail', 'secret', '4546').send_batch([(1, '998901112233', 'Hello')])
+            EskizClient('mail', 'secret', '4546').send_batch([(2, '998901112233', 'Hello')])
+        self.assertEqual(post.call_count, 3)
+        self.assertEqual(post.call_args.kwargs['headers']['Authorization'], 'Bearer first')
+
+        expired = self.response(401, {})
+        login = self.response(200, {'data': {'token': 'second'}})
+        with mock.patch('requests.Session.post', side_effect=[expired, login, sent]) as post:
+            EskizClient('mail', 'secret', '4546').send_batch([(3, '998901112233', 'Hello')])
+        self.assertEqual(post.call_args.kwargs['headers']['Authorization'], 'Bearer second')
+        self.assertEqual(cache.get(TOKEN_CACHE_KEY), 'second')
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import RevokedToken, TokenCutoff
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ['jti', 'user', 'token_type', 'expires_at', 'revoked_at']
+    list_filter = ['token_type']
+    search_fields = ['jti']
+    raw_id_fields = ['user']
+
+
+@admin.register(TokenCutoff)
+class TokenCutoffAdmin(admin.ModelAdmin):
+    list_display = ['user', 'revoked_before']
+    raw_id_fields = ['user']
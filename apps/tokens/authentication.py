@@ -0,0 +1,29 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from core.authentication import CachedJWTAuthentication
+from .revocation import cutoff_timestamp, is_revoked, issued_before
+
+
+class RevocableJWTAuthentication(CachedJWTAuthentication):
+    """
+    `CachedJWTAuthentication` that rejects revoked tokens and tokens
+    issued before the user logged out from all devices.
+    """
+
+    def get_user_queryset(self):
+        return super().get_user_queryset().select_related('token_cutoff')
+
+    def get_snapshot(self, user):
+        snapshot = super().get_snapshot(user)
+        cutoff = getattr(user, 'token_cutoff', None)
+        snapshot.data['token_cutoff'] = cutoff_timestamp(cutoff and cutoff.revoked_before)
+        return snapshot
+
+    def get_user(self, validated_token):
+        if is_revoked(validated_token):
+            raise InvalidToken(_('Token is revoked'), code='token_revoked')
+        user = super().get_user(validated_token)
+        if issued_before(validated_token, user.data.get('token_cutoff')):
+            raise InvalidToken(_('Token is revoked'), code='token_revoked')
+        return user
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class RevokedToken(models.Model):
+    jti = models.CharField(max_length=255, unique=True)
+    # Without a constraint, so revoking a token of a deleted user still works.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE, related_name='revoked_tokens',
+        db_constraint=False,
+    )
+    token_type = models.CharField(max_length=20)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Revoked token')
+        verbose_name_plural = _('Revoked tokens')
+
+    def __str__(self):
+        return f'{self.token_type} {self.jti}'
+
+
+class TokenCutoff(models.Model):
+    """
+    Tokens of `user` issued before `revoked_before` are rejected
+    (logout from all devices).
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='token_cutoff')
+    revoked_before = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _('Token cutoff')
+        verbose_name_plural = _('Token cutoffs')
+
+    def __str__(self):
+        return f'{self.user}: {self.revoked_before}'
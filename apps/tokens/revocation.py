@@ -0,0 +1,125 @@
+"""
+JWT revocation.
+
+Revoked token ids (`jti`) are rows of `RevokedToken`. Every process keeps
+the unexpired ones in a frozenset, so checking a token is a set lookup.
+No more than every `TOKEN_DENYLIST_REFRESH` seconds, a process reads the
+highest `RevokedToken` id and reloads the set when it moved (and anyway
+every `RELOAD_INTERVAL`, to drop expired ids). The check goes to the
+database, so a revocation reaches every process within that delay, with
+or without a shared cache.
+
+Logging out from all devices stores a `TokenCutoff`. The cutoff travels
+in the cached user snapshot of `RevocableJWTAuthentication`, so it costs
+no query either; other processes see it once their snapshot expires
+(`AUTH_USER_SNAPSHOT_TIMEOUT`, a few seconds without a shared cache).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from core.authentication import snapshot_key
+from .models import RevokedToken, TokenCutoff
+
+RELOAD_INTERVAL = 300
+
+_denylist = frozenset()
+_loaded_version = None
+_loaded_at = None
+_checked_at = None
+_lock = threading.Lock()
+
+
+def get_refresh_interval():
+    return getattr(settings, 'TOKEN_DENYLIST_REFRESH', 5)
+
+
+def get_denylist():
+    global _denylist, _loaded_version, _loaded_at, _checked_at
+    now = time.monotonic()
+    if _checked_at is not None and now - _checked_at < get_refresh_interval():
+        return _denylist
+    with _lock:
+        if _checked_at is None or now - _checked_at >= get_refresh_interval():
+            version = RevokedToken.objects.aggregate(version=Max('pk'))['version']
+            if _loaded_at is None or version != _loaded_version or now - _loaded_at >= RELOAD_INTERVAL:
+                _denylist = frozenset(
+                    RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list('jti', flat=True)
+                )
+                _loaded_version = version
+                _loaded_at = now
+            _checked_at = now
+    return _denylist
+
+
+def denylist_changed():
+    # Other processes notice the new row on their next check.
+    global _checked_at
+    _checked_at = None
+
+
+def is_revoked(token):
+    return token.get(api_settings.JTI_CLAIM) in get_denylist()
+
+
+def revoke(token):
+    """
+    Add `token` to the denylist. Returns False when it already was there,
+    so a token can be used up exactly once (refresh rotation).
+    """
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(
+                jti=token[api_settings.JTI_CLAIM],
+                user_id=token.get(api_settings.USER_ID_CLAIM),
+                token_type=token[api_settings.TOKEN_TYPE_CLAIM],
+                expires_at=datetime_from_epoch(token['exp']),
+            )
+    except IntegrityError:
+        return False
+    transaction.on_commit(denylist_changed)
+    return True
+
+
+def revoke_all(user_id):
+    """
+    Reject every token of the user issued before the current second.
+    """
+    # Whole seconds, like `iat`: a login right after this is not rejected.
+    revoked_before = timezone.now().replace(microsecond=0)
+    TokenCutoff.objects.update_or_create(user_id=user_id, defaults={'revoked_before': revoked_before})
+    transaction.on_commit(lambda: cache.delete(snapshot_key(user_id)))
+
+
+def get_cutoff(user_id):
+    cutoff = TokenCutoff.objects.filter(user_id=user_id).values_list('revoked_before', flat=True).first()
+    return cutoff_timestamp(cutoff)
+
+
+def cutoff_timestamp(revoked_before):
+    return int(revoked_before.timestamp()) if revoked_before else None
+
+
+def issued_before(token, cutoff):
+    # `iat` has whole seconds; tokens of the cutoff second itself are kept,
+    # so logging in again at once works.
+    return cutoff is not None and token.get('iat', 0) < cutoff
+
+
+def prune(now=None):
+    """
+    Delete denylist entries of expired tokens, and cutoffs older than any
+    token they could still reject.
+    """
+    now = now or timezone.now()
+    revoked, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+    longest = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    cutoffs, _ = TokenCutoff.objects.filter(revoked_before__lte=now - longest).delete()
+    return revoked + cutoffs
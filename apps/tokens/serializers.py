@@ -0,0 +1,50 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .revocation import get_cutoff, is_revoked, issued_before, revoke
+
+
+def check_refresh(refresh):
+    if is_revoked(refresh) or issued_before(refresh, get_cutoff(refresh.get(api_settings.USER_ID_CLAIM))):
+        raise TokenError(_('Token is revoked'))
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh that refuses revoked tokens. With `ROTATE_REFRESH_TOKENS` it
+    returns a new refresh token, and with `BLACKLIST_AFTER_ROTATION` the
+    old one is revoked; revoking is atomic, so a refresh token works once
+    even under concurrent requests.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        check_refresh(refresh)
+
+        data = {}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revoke(refresh):
+                raise TokenError(_('Token is revoked'))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        data['access'] = str(refresh.access_token)
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(error.args[0])
+        if refresh.get(api_settings.USER_ID_CLAIM) != self.context['request'].user.pk:
+            raise serializers.ValidationError(_('Token belongs to another user'))
+        return refresh
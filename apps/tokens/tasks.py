@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .revocation import prune
+
+
+@shared_task
+def prune_revoked_tokens():
+    return prune()
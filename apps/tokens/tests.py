@@ -0,0 +1,86 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import revocation
+from .models import RevokedToken, TokenCutoff
+
+
+class RevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revocation._loaded_version = None
+        revocation._loaded_at = None
+        revocation._checked_at = None
+        self.user = User.objects.create_user('staff', 'staff@example.com', 'secret', is_staff=True)
+
+    def client_for(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        return client
+
+    def test_logout_revokes_tokens(self):
+        refresh = RefreshToken.for_user(self.user)
+        client = self.client_for(refresh.access_token)
+        other = self.client_for(RefreshToken.for_user(self.user).access_token)
+        self.assertEqual(client.get('/task-stats/').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(client.post('/api/token/logout/', {'refresh': str(refresh)}).status_code, 204)
+        self.assertEqual(client.get('/task-stats/').status_code, 401)
+        self.assertEqual(APIClient().post('/api/token/refresh/', {'refresh': str(refresh)}).status_code, 401)
+        with self.assertNumQueries(0):
+            self.assertEqual(other.get('/task-stats/').status_code, 200)
+
+    def test_revocation_by_another_process(self):
+        access = RefreshToken.for_user(self.user).access_token
+        client = self.client_for(access)
+        self.assertEqual(client.get('/task-stats/').status_code, 200)
+        # Written elsewhere: no cache entry or local reset announces it.
+        RevokedToken.objects.create(
+            jti=access['jti'], token_type='access', expires_at=timezone.now() + datetime.timedelta(minutes=5),
+        )
+        self.assertEqual(client.get('/task-stats/').status_code, 200)
+        revocation._checked_at -= revocation.get_refresh_interval()
+        self.assertEqual(client.get('/task-stats/').status_code, 401)
+
+    def test_refresh_rotation(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().post('/api/token/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()['refresh'], refresh)
+        self.assertEqual(APIClient().post('/api/token/refresh/', {'refresh': refresh}).status_code, 401)
+        rotated = APIClient().post('/api/token/refresh/', {'refresh': response.json()['refresh']})
+        self.assertEqual(rotated.status_code, 200)
+        self.assertEqual(self.client_for(rotated.json()['access']).get('/task-stats/').status_code, 200)
+
+    def test_logout_all_devices(self):
+        # Issued in an earlier second than the cutoff.
+        phone = RefreshToken.for_user(self.user)
+        phone['iat'] -= 2
+        laptop_token = RefreshToken.for_user(self.user)
+        laptop_token['iat'] -= 2
+        laptop = self.client_for(laptop_token.access_token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(laptop.post('/api/token/logout-all/').status_code, 204)
+        self.assertEqual(laptop.get('/task-stats/').status_code, 401)
+        self.assertEqual(self.client_for(phone.access_token).get('/task-stats/').status_code, 401)
+        self.assertEqual(APIClient().post('/api/token/refresh/', {'refresh': str(phone)}).status_code, 401)
+
+        # Logging in again right away works.
+        later = self.client_for(RefreshToken.for_user(self.user).access_token)
+        self.assertEqual(later.get('/task-stats/').status_code, 200)
+
+    def test_prune(self):
+        now = timezone.now()
+        RevokedToken.objects.create(jti='old', token_type='access', expires_at=now - datetime.timedelta(minutes=1))
+        RevokedToken.objects.create(jti='new', token_type='access', expires_at=now + datetime.timedelta(minutes=1))
+        TokenCutoff.objects.create(user=self.user, revoked_before=now - datetime.timedelta(days=30))
+        self.assertEqual(revocation.prune(now), 2)
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['new'])
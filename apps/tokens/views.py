@@ -0,0 +1,35 @@
+from rest_framework import generics, permissions, status, views
+from rest_framework.response import Response
+from rest_framework_simplejwt.tokens import Token
+
+from .revocation import revoke, revoke_all
+from .serializers import LogoutSerializer
+
+
+class LogoutView(generics.GenericAPIView):
+    """
+    Revoke the access token of the request and, when given, its
+    `refresh` token.
+    """
+    serializer_class = LogoutSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, format=None):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if isinstance(request.auth, Token):
+            revoke(request.auth)
+        if serializer.validated_data.get('refresh'):
+            revoke(serializer.validated_data['refresh'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class LogoutAllView(views.APIView):
+    """
+    Revoke every token of the user, on all devices.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, format=None):
+        revoke_all(request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,35 @@
+"""
+Celery app for off-request work (email and SMS outboxes, image
+derivatives).
+
+The broker defaults to kombu's filesystem transport under `var/celery`, so
+workers run without Redis or RabbitMQ:
+
+    celery -A config worker -Q default,mail,sms,images -l info
+    celery -A config beat -l info
+
+Set CELERY_BROKER_URL (e.g. redis://localhost:6379/0) to use a real
+broker, and CELERY_TASK_ALWAYS_EAGER to run tasks inline. Tests run them
+inline.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+app = Celery('config')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
+
+
+@app.on_after_configure.connect
+def create_broker_folders(sender, **kwargs):
+    if sender.conf.broker_url.startswith('filesystem://'):
+        for folder in set(sender.conf.broker_transport_options.values()):
+            os.makedirs(folder, exist_ok=True)
+
+
+@app.on_after_finalize.connect
+def connect_task_metrics(sender, **kwargs):
+    from core import task_metrics  # noqa: F401
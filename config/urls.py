@@ -14,14 +14,21 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 ""
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from apps.tokens.views import LogoutAllView, LogoutView
+from core.media import serve_media
+from core.response_cache import ResponseCacheStatsView
+from core.task_metrics import TaskStatsView
+
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -48,6 +55,13 @@ urlpatterns = [
     # token
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/logout/', LogoutView.as_view(), name='token_logout'),
+    path('api/token/logout-all/', LogoutAllView.as_view(), name='token_logout_all'),
+
+    # response cache counters
+    path('cache-stats/', ResponseCacheStatsView.as_view(), name='cache_stats'),
+    # celery task latency
+    path('task-stats/', TaskStatsView.as_view(), name='task_stats'),
 ]
 
 
@@ -69,7 +83,13 @@ urlpatterns += [
 
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+# Media is served in production too, range capable and optionally handed
+# to the front proxy (MEDIA_SENDFILE).
+if settings.MEDIA_URL.startswith('/'):
+    urlpatterns += [
+        re_path(rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<path>.+)$', serve_media, name='media'),
+    ]
 
 
 
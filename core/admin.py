@@ -0,0 +1,54 @@
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.utils import timezone
+
+from core.translations import load_translations
+
+
+class TranslationBatchChangeList(ChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        load_translations(self.result_list, *self.model_admin.translation_related)
+
+
+class TranslationBatchMixin:
+    """
+    Load the translations of a changelist page (and of the related objects
+    named in `translation_related`) in one query per model, instead of
+    one per row and language when `__str__` or translated columns render.
+    """
+    translation_related = []
+
+    def get_changelist(self, request, **kwargs):
+        return TranslationBatchChangeList
+
+
+class TranslatedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    Related field filter whose choices are labelled with one translation
+    query, for foreign keys and many-to-many fields to translated models.
+    """
+
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        queryset = field.related_model._default_manager.complex_filter(field.get_limit_choices_to())
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return [(obj.pk, str(obj)) for obj in load_translations(queryset)]
+
+
+class OutboxAdmin(admin.ModelAdmin):
+    """
+    Admin for `core.outbox.OutboxModel` tables, with an action that
+    queues the selected unsent rows again right away.
+    """
+    list_filter = ['status']
+    list_per_page = 50
+    readonly_fields = ['status', 'attempts', 'next_attempt_at', 'last_error', 'created_at', 'sent_at']
+    actions = ['retry_now']
+
+    @admin.action(description='Retry now')
+    def retry_now(self, request, queryset):
+        queryset.exclude(status=queryset.model.SENT).update(
+            status=queryset.model.PENDING, attempts=0, next_attempt_at=timezone.now(),
+        )
@@ -0,0 +1,123 @@
+"""
+JWT authentication without a user query per request.
+
+`CachedJWTAuthentication` validates the token like simplejwt's
+`JWTAuthentication`, but resolves it to a `UserSnapshot` kept in the
+cache for `AUTH_USER_SNAPSHOT_TIMEOUT` seconds instead of loading the
+user row. Saving or deleting the user drops the snapshot.
+
+Public endpoints set `authentication_classes = []`, so they skip header
+parsing entirely. Subclasses add cached fields with `get_user_queryset`
+and `get_snapshot` (see `apps.tokens.authentication`).
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+SNAPSHOT_FIELDS = ['is_active', 'is_staff', 'is_superuser']
+
+
+def snapshot_key(pk):
+    return f'auth-user:{pk}'
+
+
+def get_snapshot_timeout():
+    return getattr(settings, 'AUTH_USER_SNAPSHOT_TIMEOUT', 60)
+
+
+class UserSnapshot:
+    """
+    The cached fields of an authenticated user. Anything else (another
+    field, `check_password()`, `save()`) loads the user row on first use;
+    `instance` is the loaded model instance.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, data):
+        self.data = data
+        self._instance = None
+
+    @classmethod
+    def from_user(cls, user):
+        data = {'pk': user.pk, 'username': user.get_username()}
+        for name in SNAPSHOT_FIELDS:
+            data[name] = getattr(user, name, False)
+        snapshot = cls(data)
+        snapshot._instance = user
+        return snapshot
+
+    @property
+    def pk(self):
+        return self.data['pk']
+
+    id = pk
+
+    def get_username(self):
+        return self.data['username']
+
+    @property
+    def instance(self):
+        if self._instance is None:
+            self._instance = get_user_model()._default_manager.get(pk=self.pk)
+        return self._instance
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in self.data:
+            return self.data[name]
+        return getattr(self.instance, name)
+
+    def __eq__(self, other):
+        return getattr(other, 'pk', None) == self.pk and getattr(other, 'is_authenticated', False)
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return self.get_username()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user_queryset(self):
+        return self.user_model._default_manager.all()
+
+    def get_snapshot(self, user):
+        return UserSnapshot.from_user(user)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        data = cache.get(snapshot_key(user_id))
+        if data is not None:
+            snapshot = UserSnapshot(data)
+        else:
+            try:
+                user = self.get_user_queryset().get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            snapshot = self.get_snapshot(user)
+            cache.set(snapshot_key(user_id), snapshot.data, get_snapshot_timeout())
+
+        if not snapshot.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return snapshot
+
+
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    cache.delete(snapshot_key(getattr(instance, api_settings.USER_ID_FIELD)))
+
+
+post_save.connect(invalidate_user_snapshot, sender=settings.AUTH_USER_MODEL, dispatch_uid='auth-user-snapshot-save')
+post_delete.connect(
+    invalidate_user_snapshot, sender=settings.AUTH_USER_MODEL, dispatch_uid='auth-user-snapshot-delete',
+)
@@ -0,0 +1,33 @@
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'version:'
+
+
+def get_version(name):
+    """
+    Current version number of a named group of cached data.
+    """
+    key = VERSION_KEY_PREFIX + name
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def get_versions(names):
+    keys = [VERSION_KEY_PREFIX + name for name in names]
+    found = cache.get_many(keys)
+    return [found.get(key) or get_version(name) for key, name in zip(keys, names)]
+
+
+def bump_version(name):
+    """
+    Invalidate every cache entry built from the named group.
+    """
+    key = VERSION_KEY_PREFIX + name
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+        return 2
@@ -0,0 +1,87 @@
+"""
+Conditional GET (ETag) for read-only viewsets.
+
+The ETag comes from one aggregate query (max of `validator_field` and
+the row count) plus the cache versions of the viewset's `cache_models`,
+so a matching `If-None-Match` is answered with 304 before any object is
+loaded or serialized.
+
+No `Last-Modified` is sent: `validator_field` is not moved by deletes or
+by edits of translations and images, so `If-Modified-Since` would give
+false 304s where the ETag does not.
+"""
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.translation import get_language
+from rest_framework.response import Response
+
+from core.cache_versions import get_versions
+from core.response_cache import model_version_name
+
+
+class ConditionalGetMixin:
+    validator_field = 'updated_at'
+
+    def get_validator_queryset(self):
+        queryset = self.get_queryset()
+        if self.action == 'list':
+            return self.filter_queryset(queryset)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        # A lookup value of the wrong type is a 404, as in `get_object`.
+        try:
+            return queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+
+    def get_validators(self, request):
+        """
+        Return the ETag of the current request.
+        """
+        model = self.get_queryset().model
+        aggregates = {'count': Count('pk')}
+        try:
+            model._meta.get_field(self.validator_field)
+            aggregates['last_modified'] = Max(self.validator_field)
+        except FieldDoesNotExist:
+            pass
+        values = self.get_validator_queryset().order_by().aggregate(**aggregates)
+        last_modified = values.get('last_modified')
+
+        versions = get_versions([model_version_name(model) for model in getattr(self, 'cache_models', ())])
+        state = '|'.join(map(str, [
+            request.scheme,
+            request.get_host(),
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT_LANGUAGE', ''),
+            get_language(),
+            request.accepted_renderer.format,
+            '.'.join(map(str, versions)),
+            values['count'],
+            last_modified.isoformat() if last_modified else '',
+        ]))
+        return '"%s"' % hashlib.md5(state.encode()).hexdigest()
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+        etag = self.get_validators(request)
+        conditional = get_conditional_response(request, etag=etag)
+        if conditional is not None:
+            # 304 Not Modified, or 412 for a failed If-Match.
+            response = Response(status=conditional.status_code)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,245 @@
+"""
+Write-behind counters.
+
+Increments are buffered in process and written as one
+`UPDATE ... SET field = field + n` per distinct n, so concurrent views
+never overwrite each other and no row is read back first. A buffer is
+flushed once `max_pending` rows are dirty, by a background thread every
+`flush_interval` seconds (`COUNTER_FLUSH_THREAD`), and when the process
+exits: `atexit`, plus the `worker_exit` hook of `gunicorn.conf.py`.
+Increments whose UPDATE fails go back into the buffer. Only a process
+that is killed outright loses its buffer.
+
+The UPDATEs send no signals, so after a flush the counter bumps the
+cache version of its model itself, at most every `version_interval`
+seconds, and cached responses and ETags pick up the new counts.
+"""
+import atexit
+import hashlib
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+
+from core.response_cache import model_changed
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 10
+MAX_PENDING = 500
+VERSION_INTERVAL = 60
+
+_counters = weakref.WeakSet()
+
+
+def get_visitor(request):
+    """
+    Identify a visitor well enough to count their views once per window.
+    """
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    address = forwarded.split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+    return f'{address}|{request.META.get("HTTP_USER_AGENT", "")}'
+
+
+class BloomFilter:
+    """
+    Fixed size set membership test with false positives but no false
+    negatives. `size` is the number of bits.
+    """
+
+    def __init__(self, size=1 << 20, hashes=4):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray(size // 8 + 1)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key):
+        """
+        Add `key`, returning False if it was (probably) present already.
+        """
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        return added
+
+
+class WindowedBloomFilter:
+    """
+    Remembers keys for between one and two `window` seconds, using a Bloom
+    filter per window and keeping the previous one around.
+    """
+
+    def __init__(self, window=60 * 60 * 24, size=1 << 20, hashes=4):
+        self.window = window
+        self.size = size
+        self.hashes = hashes
+        self.current_window = None
+        self.current = self.previous = None
+
+    def _rotate(self, now):
+        window = int(now // self.window)
+        if window == self.current_window:
+            return
+        self.previous = self.current if self.current_window == window - 1 else None
+        self.current = BloomFilter(self.size, self.hashes)
+        self.current_window = window
+
+    def add(self, key, now=None):
+        self._rotate(time.time() if now is None else now)
+        if self.previous is not None and key in self.previous:
+            return False
+        return self.current.add(key)
+
+
+class BufferedCounter:
+    """
+    Buffered `F(field) + n` counter for `model` rows, with optional
+    de-duplication of (visitor, pk) pairs.
+    """
+
+    def __init__(
+        self, model, field, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING, dedupe_window=None,
+        version_interval=VERSION_INTERVAL,
+    ):
+        self.model = model
+        self.field = field
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.version_interval = version_interval
+        # Written but not yet visible through the cache version.
+        self.stale = False
+        self.last_bump = None
+        self.seen = WindowedBloomFilter(dedupe_window) if dedupe_window else None
+        self.pending = defaultdict(int)
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.timer_pid = None
+        _counters.add(self)
+
+    def start_timer(self):
+        """
+        Start the flush thread of this process. Started on first use, so
+        every forked worker gets its own.
+        """
+        with self.lock:
+            if self.timer_pid == os.getpid() or not settings.COUNTER_FLUSH_THREAD:
+                return
+            self.timer_pid = os.getpid()
+        name = f'flush-{self.model._meta.label_lower}.{self.field}'
+        threading.Thread(target=self.run_timer, name=name, daemon=True).start()
+
+    def run_timer(self):
+        while True:
+            time.sleep(self.flush_interval)
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not flush %s.%s', self.model._meta.label, self.field)
+
+    def record(self, pk, visitor=None):
+        """
+        Count one event for `pk`. Returns False if `visitor` was already
+        counted for it in the current window.
+        """
+        self.start_timer()
+        with self.lock:
+            if self.seen is not None and visitor is not None and not self.seen.add(f'{visitor}:{pk}'):
+                return False
+            self.pending[pk] += 1
+            due = (
+                len(self.pending) >= self.max_pending
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+        return True
+
+    def flush(self):
+        """
+        Write the buffered increments, returning the number of rows updated.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(int)
+            self.last_flush = time.monotonic()
+        if not pending:
+            self.bump_version()
+            return 0
+
+        by_amount = defaultdict(list)
+        for pk, amount in pending.items():
+            by_amount[amount].append(pk)
+        updated = 0
+        for amount, pks in list(by_amount.items()):
+            increment = self.get_increment(amount)
+            try:
+                updated += self.model.objects.filter(pk__in=pks).update(**{self.field: F(self.field) + increment})
+            except Exception:
+                self.restore(by_amount)
+                raise
+            del by_amount[amount]
+        if updated:
+            self.stale = True
+        self.bump_version()
+        return updated
+
+    def bump_version(self):
+        """
+        Bump the cache version of `model` when flushed counts are not
+        visible yet and the last bump is `version_interval` seconds ago.
+        """
+        now = time.monotonic()
+        with self.lock:
+            if not self.stale:
+                return False
+            if self.last_bump is not None and now - self.last_bump < self.version_interval:
+                return False
+            self.stale = False
+            self.last_bump = now
+        model_changed(self.model)
+        return True
+
+    def restore(self, by_amount):
+        """
+        Put increments that were not written back into the buffer.
+        """
+        with self.lock:
+            for amount, pks in by_amount.items():
+                for pk in pks:
+                    self.pending[pk] += amount
+
+    def get_increment(self, amount):
+        return amount
+
+
+def flush_counters():
+    """
+    Flush every counter of this process; for exit hooks.
+    """
+    for counter in list(_counters):
+        try:
+            counter.flush()
+        except Exception:
+            logger.exception('Could not flush %s.%s', counter.model._meta.label, counter.field)
+
+
+atexit.register(flush_counters)
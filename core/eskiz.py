@@ -1,10 +1,113 @@
-from eskiz_sms import EskizSMS
+"""
+Eskiz (notify.eskiz.uz) SMS client.
+
+The client is created on first use instead of at import time, and the
+bearer token is kept in the Django cache, so every process and thread
+shares one login until the token expires or is rejected.
+"""
+import threading
+
+import requests
 from django.conf import settings
+from django.core.cache import cache
+
+from core.outbox import DeliveryError
+
+API_URL = 'https://notify.eskiz.uz/api'
+TOKEN_CACHE_KEY = 'eskiz:token'
+# Tokens are valid for 30 days, renew them a little earlier.
+TOKEN_TIMEOUT = 60 * 60 * 24 * 29
+REQUEST_TIMEOUT = 10
+RETRY_STATUSES = {401, 408, 429, 500, 502, 503, 504}
+
+
+class SMSError(DeliveryError):
+    def __init__(self, message, status=None, retry=True):
+        super().__init__(message, retry=retry)
+        self.status = status
+
+
+class EskizClient:
+    def __init__(self, email, password, sender, api_url=API_URL, timeout=REQUEST_TIMEOUT):
+        self.email = email
+        self.password = password
+        self.sender = sender
+        self.api_url = api_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._login_lock = threading.Lock()
+
+    def _post(self, path, token=None, **kwargs):
+        headers = {'Accept': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        try:
+            response = self.session.post(f'{self.api_url}{path}', headers=headers, timeout=self.timeout, **kwargs)
+        except requests.RequestException as error:
+            raise SMSError(f'Eskiz {path} failed: {error}') from error
+        if response.status_code >= 400:
+            raise SMSError(
+                f'Eskiz {path} returned {response.status_code}: {response.text[:500]}',
+                status=response.status_code,
+                retry=response.status_code in RETRY_STATUSES,
+            )
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+
+    def login(self):
+        data = self._post('/auth/login', data={'email': self.email, 'password': self.password})
+        token = (data.get('data') or {}).get('token')
+        if not token:
+            raise SMSError('Eskiz login returned no token', retry=False)
+        cache.set(TOKEN_CACHE_KEY, token, TOKEN_TIMEOUT)
+        return token
+
+    def get_token(self):
+        token = cache.get(TOKEN_CACHE_KEY)
+        if token is None:
+            with self._login_lock:
+                token = cache.get(TOKEN_CACHE_KEY) or self.login()
+        return token
+
+    def send_batch(self, messages):
+        """
+        Send `(id, phone_number, text)` messages in one request, logging in
+        again once if the cached token was rejected.
+        """
+        payload = {
+            'messages': [{'user_sms_id': str(pk), 'to': phone, 'text': text} for pk, phone, text in messages],
+            'from': self.sender,
+            'dispatch_id': messages[0][0],
+        }
+        try:
+            return self._post('/message/sms/send-batch', token=self.get_token(), json=payload)
+        except SMSError as error:
+            if error.status != 401:
+                raise
+            cache.delete(TOKEN_CACHE_KEY)
+            return self._post('/message/sms/send-batch', token=self.get_token(), json=payload)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = EskizClient(settings.ESKIZ_EMAIL, settings.ESKIZ_PASSWORD, settings.ESKIZ_FROM)
+    return _client
 
 
-eskiz = EskizSMS(
-            email=settings.ESKIZ_EMAIL,
-            password=settings.ESKIZ_PASSWORD,
-        )
+class EskizProvider:
+    """
+    `SMS_PROVIDER` sending through the shared Eskiz client. Eskiz accepts
+    a batch as a whole, so there are no per-message errors.
+    """
 
-# eskiz.send_sms(str(number)[1:], message, from_whom='4546')
\ No newline at end of file
+    def send_batch(self, messages):
+        get_client().send_batch([(message.pk, message.phone_number, message.text) for message in messages])
+        return {}
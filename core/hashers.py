@@ -0,0 +1,58 @@
+"""
+Password hashing policy.
+
+`TunedPBKDF2PasswordHasher` is Django's PBKDF2 hasher, with the iteration
+count taken from `PASSWORD_HASH_ITERATIONS` so it can be set to what the
+login servers can afford (see the `benchmark_hashers` command). Django
+rehashes a password on the next successful login when its stored hash
+uses another iteration count or a hasher further down `PASSWORD_HASHERS`.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hashers
+
+BENCHMARK_PASSWORD = 'correct horse battery staple'
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
+
+
+def time_hasher(hasher, rounds=5):
+    """
+    Median milliseconds `hasher` takes to hash a password.
+    """
+    salt = hasher.salt()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.encode(BENCHMARK_PASSWORD, salt)
+        timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def suggest_iterations(target_ms, rounds=5):
+    """
+    PBKDF2 iterations that take about `target_ms` on this machine, never
+    fewer than Django's default.
+    """
+    hasher = TunedPBKDF2PasswordHasher()
+    per_iteration = time_hasher(hasher, rounds) / hasher.iterations
+    return max(PBKDF2PasswordHasher.iterations, int(target_ms / per_iteration) // 1000 * 1000)
+
+
+def benchmark(rounds=5):
+    """
+    `(algorithm, milliseconds)` for every usable hasher in
+    `PASSWORD_HASHERS`; hashers whose library is not installed are skipped.
+    """
+    results = []
+    for hasher in get_hashers():
+        try:
+            results.append((hasher.algorithm, time_hasher(hasher, rounds)))
+        except ValueError:
+            continue
+    return results
@@ -0,0 +1,137 @@
+"""
+Responsive image derivatives.
+
+When a watched model is saved with a new image, the `build_variants_task`
+Celery task (images queue) renders it at every width in `IMAGE_SIZES` as
+WebP and JPEG, stores the results under content-hashed names (so they can
+be cached forever) and writes the map into the model's `image_variants`
+JSON field:
+
+    {'source': 'product_images/a.jpg',
+     'sizes': {'small': {'width': 200, 'webp': '...', 'jpeg': '...'}, ...}}
+"""
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from celery import shared_task
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+
+from core.media import strip_digest
+from core.response_cache import model_changed
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SIZES = {
+    'small': 200,
+    'medium': 480,
+    'large': 1024,
+}
+IMAGE_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+DERIVATIVES_DIR = 'derivatives'
+
+# model -> image field name, filled by `watch_images`
+WATCHED_MODELS = {}
+
+
+def _derivative_name(source, size, extension, content):
+    stem = os.path.splitext(strip_digest(os.path.basename(source)))[0]
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    return f'{DERIVATIVES_DIR}/{os.path.dirname(source)}/{stem}.{size}.{digest}.{extension}'
+
+
+def render_variants(source):
+    """
+    Render and store every size of the stored image `source`. Sizes wider
+    than the original are skipped.
+    """
+    with default_storage.open(source) as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+
+    sizes = {}
+    for size, width in IMAGE_SIZES.items():
+        if width >= original.width and sizes:
+            break
+        image = original.copy()
+        image.thumbnail((width, width * 4), Image.LANCZOS)
+        variant = {'width': image.width}
+        for extension, options in IMAGE_FORMATS.items():
+            converted = image.convert('RGB') if options['format'] == 'JPEG' else image
+            buffer = BytesIO()
+            converted.save(buffer, **options)
+            content = buffer.getvalue()
+            name = _derivative_name(source, size, extension, content)
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(content))
+            variant[extension] = name
+        sizes[size] = variant
+    return {'source': source, 'sizes': sizes}
+
+
+def build_variants(model, pk, field='image'):
+    """
+    Render the derivatives of one row and store the map, unless the image
+    changed again in the meantime. Returns the map or None.
+    """
+    source = model.objects.filter(pk=pk).values_list(field, flat=True).first()
+    if not source:
+        return None
+    try:
+        variants = render_variants(source)
+    except (OSError, Image.DecompressionBombError):
+        logger.exception('Could not render derivatives of %s', source)
+        return None
+    if model.objects.filter(pk=pk, **{field: source}).update(image_variants=variants):
+        # update() sends no signals.
+        model_changed(model)
+    return variants
+
+
+def build_in_worker(model, pk, field):
+    close_old_connections()
+    try:
+        build_variants(model, pk, field)
+    finally:
+        close_old_connections()
+
+
+@shared_task(name='core.images.build_variants')
+def build_variants_task(model_label, pk, field='image'):
+    build_variants(apps.get_model(model_label), pk, field)
+
+
+def schedule_variants(model, pk, field='image'):
+    """
+    Queue the derivatives once the current transaction commits.
+    """
+    transaction.on_commit(lambda: build_variants_task.delay(model._meta.label, pk, field))
+
+
+def _image_saved(sender, instance, raw=False, **kwargs):
+    field = WATCHED_MODELS[sender]
+    name = getattr(instance, field).name
+    if raw or not name or (instance.image_variants or {}).get('source') == name:
+        return
+    schedule_variants(sender, instance.pk, field)
+
+
+def watch_images(*models, field='image'):
+    """
+    Generate derivatives whenever the image of one of `models` changes.
+    The models need an `image_variants` JSONField.
+    """
+    for model in models:
+        WATCHED_MODELS[model] = field
+        post_save.connect(_image_saved, sender=model, dispatch_uid=f'image-variants-{model._meta.label}')
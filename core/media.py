@@ -0,0 +1,239 @@
+"""
+Media storage, URLs and serving.
+
+`MediaStorage` is the project's file storage (`DEFAULT_FILE_STORAGE`), so
+every image URL, from DRF file fields, `ImageVariantsField`, the category
+tree or the admin, comes from its `url()`:
+
+- Uploads are stored under content-hashed names
+  (`product_images/milk.3fa2b1c9d0e4f5a6.jpg`), like the derivatives of
+  `core.images`. Their content never changes, so `serve_media` lets
+  clients and proxies cache them for a year.
+- `MEDIA_BASE_URL` (a site or CDN origin) is prefixed to the URLs; when
+  blank, serializers make them absolute from the request.
+- With `MEDIA_URL_SIGNING` every URL carries an HMAC of the file name and
+  `serve_media` refuses files without a valid one.
+
+The settings are read once per storage instance, not per URL.
+
+`serve_media` streams files from `MEDIA_ROOT`, answers `Range` and
+conditional requests, and with `MEDIA_SENDFILE` leaves the transfer to a
+front proxy through `X-Accel-Redirect` (nginx) or `X-Sendfile` (Apache,
+lighttpd).
+"""
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.functional import cached_property
+from django.utils.http import http_date
+
+DIGEST_LENGTH = 16
+# `name.<digest>.ext`, or `name.<digest>_<suffix>.ext` when the storage
+# had to make the name unique.
+HASHED_NAME = re.compile(r'\.[0-9a-f]{%d}(?:_[A-Za-z0-9]{7})?(?=\.[^./]+$)' % DIGEST_LENGTH)
+SIGNATURE_PARAM = 'sig'
+SIGNATURE_SALT = 'core.media'
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+STREAM_CHUNK_SIZE = 64 * 1024
+SENDFILE_HEADERS = {
+    'x-accel-redirect': 'X-Accel-Redirect',
+    'x-sendfile': 'X-Sendfile',
+}
+RANGE_HEADER = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+def content_digest(content):
+    sha = hashlib.sha256()
+    for chunk in content.chunks():
+        sha.update(chunk)
+    return sha.hexdigest()[:DIGEST_LENGTH]
+
+
+def is_hashed(name):
+    return HASHED_NAME.search(name) is not None
+
+
+def strip_digest(name):
+    return HASHED_NAME.sub('', name)
+
+
+class MediaStorage(FileSystemStorage):
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting.startswith('MEDIA_') or setting == 'SECRET_KEY':
+            for name in ('base_url', 'signing_key', 'sendfile_header', 'accel_prefix', 'max_age'):
+                self.__dict__.pop(name, None)
+
+    @cached_property
+    def base_url(self):
+        base_url = self._value_or_setting(self._base_url, settings.MEDIA_URL)
+        if base_url and not base_url.endswith('/'):
+            base_url += '/'
+        if self._base_url is None and base_url.startswith('/') and settings.MEDIA_BASE_URL:
+            base_url = settings.MEDIA_BASE_URL.rstrip('/') + base_url
+        return base_url
+
+    @cached_property
+    def signing_key(self):
+        if not settings.MEDIA_URL_SIGNING:
+            return None
+        return settings.MEDIA_SIGNING_KEY or settings.SECRET_KEY
+
+    @cached_property
+    def sendfile_header(self):
+        backend = (settings.MEDIA_SENDFILE or '').lower()
+        if backend and backend not in SENDFILE_HEADERS:
+            raise ValueError(f'Unknown MEDIA_SENDFILE {settings.MEDIA_SENDFILE!r}')
+        return SENDFILE_HEADERS.get(backend)
+
+    @cached_property
+    def accel_prefix(self):
+        return settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/'
+
+    @cached_property
+    def max_age(self):
+        return settings.MEDIA_CACHE_MAX_AGE
+
+    def save(self, name, content, max_length=None):
+        """
+        Store `content` under a name carrying its digest.
+        """
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if not is_hashed(name):
+            root, extension = posixpath.splitext(name)
+            name = f'{root}.{content_digest(content)}{extension}'
+        return super().save(name, content, max_length)
+
+    def signature(self, name):
+        return salted_hmac(SIGNATURE_SALT, name, secret=self.signing_key, algorithm='sha256').hexdigest()[:32]
+
+    def check_signature(self, name, signature):
+        return bool(signature) and constant_time_compare(signature, self.signature(name))
+
+    def url(self, name):
+        url = super().url(name)
+        if self.signing_key:
+            url = f'{url}?{SIGNATURE_PARAM}={self.signature(name)}'
+        return url
+
+
+def parse_range(header, size):
+    """
+    `(start, end)` of a single `bytes=` range, None to send the whole
+    file (no, multiple or malformed ranges). Raises ValueError when the
+    range lies outside the file.
+    """
+    match = RANGE_HEADER.fullmatch(header.strip()) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    if not size:
+        # An empty file has no byte a range could select.
+        raise ValueError(header)
+    start, end = match.groups()
+    if start == '':
+        length = int(end)
+        if not length:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    """
+    Serve a stored file of `MediaStorage`.
+    """
+    storage = default_storage
+    name = posixpath.normpath(path).lstrip('/')
+    if storage.signing_key and not storage.check_signature(name, request.GET.get(SIGNATURE_PARAM)):
+        raise Http404('Invalid signature')
+    try:
+        full_path = storage.path(name)
+        status = os.stat(full_path)
+    except (SuspiciousFileOperation, NotImplementedError, OSError):
+        raise Http404('File does not exist')
+    if not stat.S_ISREG(status.st_mode):
+        raise Http404('File does not exist')
+
+    size = status.st_size
+    etag = f'"{size:x}-{int(status.st_mtime):x}"'
+    content_type, encoding = mimetypes.guess_type(name)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(status.st_mtime))
+    if not_modified is not None:
+        response = not_modified
+    elif storage.sendfile_header:
+        # The proxy sends the body and answers Range itself.
+        response = HttpResponse(content_type=content_type or 'application/octet-stream')
+        if storage.sendfile_header == 'X-Accel-Redirect':
+            response['X-Accel-Redirect'] = storage.accel_prefix + quote(name)
+        else:
+            response['X-Sendfile'] = full_path
+    else:
+        response = stream_file(request, full_path, size, etag, content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(status.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    if is_hashed(name):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=storage.max_age)
+    return response
+
+
+def stream_file(request, full_path, size, etag, content_type):
+    content_type = content_type or 'application/octet-stream'
+    if_range = request.headers.get('If-Range')
+    try:
+        byte_range = None if if_range and if_range != etag else parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=content_type)
+        else:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = size
+        return response
+
+    start, end = byte_range
+    length = end - start + 1
+    body = () if request.method == 'HEAD' else read_range(full_path, start, length)
+    response = StreamingHttpResponse(body, status=206, content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = length
+    return response
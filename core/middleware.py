@@ -0,0 +1,51 @@
+"""
+Request language negotiation.
+
+The language comes from `?lang=<code>`, else from the best
+`Accept-Language` match among the languages in `PARLER_LANGUAGES`, and is
+activated for the whole request, so querysets prefetch and serializers
+render that language (and its fallbacks) only.
+"""
+from django.conf import settings
+from django.utils import translation
+from django.utils.cache import patch_vary_headers
+from django.utils.translation.trans_real import parse_accept_lang_header
+
+from core.serializers import LANGUAGE_QUERY_PARAM
+
+
+def get_supported_languages():
+    return [language['code'] for language in settings.PARLER_LANGUAGES[None]]
+
+
+def negotiate_language(request):
+    """
+    Return the requested translation language, or None to keep the default.
+    """
+    supported = get_supported_languages()
+    requested = request.GET.get(LANGUAGE_QUERY_PARAM, '').strip().lower()
+    if requested in supported:
+        return requested
+    for code, quality in parse_accept_lang_header(request.META.get('HTTP_ACCEPT_LANGUAGE', '')):
+        if code == '*':
+            break
+        for candidate in (code, code.split('-')[0]):
+            if candidate in supported:
+                return candidate
+    return None
+
+
+class LanguageMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        language = negotiate_language(request)
+        if language is None:
+            response = self.get_response(request)
+        else:
+            with translation.override(language):
+                response = self.get_response(request)
+            response.setdefault('Content-Language', language)
+        patch_vary_headers(response, ['Accept-Language'])
+        return response
@@ -0,0 +1,115 @@
+"""
+Shared parts of the database outboxes (`apps.sms`, `apps.mail`).
+
+Messages are rows in a table built on `OutboxModel`. A worker claims the
+due rows with `claim_due`, delivers them and hands the outcome to
+`record_results`. That marks the rows sent, or schedules a retry with
+exponential backoff until `MAX_ATTEMPTS`.
+"""
+import datetime
+import logging
+import uuid
+
+from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = datetime.timedelta(seconds=30)
+BACKOFF_MAX = datetime.timedelta(hours=1)
+# A claim older than this belongs to a worker that died mid-send.
+CLAIM_TIMEOUT = datetime.timedelta(minutes=5)
+
+
+class DeliveryError(Exception):
+    """
+    A failed delivery. `retry` is False when sending again cannot succeed.
+    """
+
+    def __init__(self, message, retry=True):
+        super().__init__(message)
+        self.retry = retry
+
+
+class OutboxModel(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, _('Pending')),
+        (SENDING, _('Sending')),
+        (SENT, _('Sent')),
+        (FAILED, _('Failed')),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+
+def get_backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def _due(model, now):
+    return (
+        Q(status=model.PENDING, next_attempt_at__lte=now)
+        | Q(status=model.SENDING, claimed_at__lt=now - CLAIM_TIMEOUT)
+    )
+
+
+def claim_due(model, limit, now=None):
+    """
+    Mark up to `limit` due rows as being sent by this worker. The claim is
+    a conditional update, so concurrent workers never send the same row
+    twice.
+    """
+    now = now or timezone.now()
+    due = model.objects.filter(_due(model, now)).order_by('next_attempt_at', 'pk').values_list('pk', flat=True)
+    claim = uuid.uuid4()
+    model.objects.filter(_due(model, now), pk__in=list(due[:limit])).update(
+        status=model.SENDING, claim=claim, claimed_at=now,
+    )
+    return list(model.objects.filter(claim=claim).order_by('pk'))
+
+
+def record_results(messages, errors, now=None):
+    """
+    Store the outcome of a delivery attempt. `errors` maps the pk of each
+    failed row to its exception; a `DeliveryError` with `retry=False`
+    fails the row at once.
+    """
+    if not messages:
+        return
+    now = now or timezone.now()
+    model = type(messages[0])
+    sent = [message.pk for message in messages if message.pk not in errors]
+    model.objects.filter(pk__in=sent).update(
+        status=model.SENT, sent_at=now, attempts=F('attempts') + 1, claim=None, last_error='',
+    )
+    for message in messages:
+        error = errors.get(message.pk)
+        if error is None:
+            continue
+        message.attempts += 1
+        message.claim = None
+        message.last_error = str(error)
+        if getattr(error, 'retry', True) and message.attempts < MAX_ATTEMPTS:
+            message.status = model.PENDING
+            message.next_attempt_at = now + get_backoff(message.attempts)
+        else:
+            message.status = model.FAILED
+            logger.warning('%s %s failed: %s', model._meta.label, message.pk, error)
+        message.save(update_fields=['attempts', 'claim', 'last_error', 'status', 'next_attempt_at'])
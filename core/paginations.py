@@ -1,5 +1,17 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 DEFAULT_PAGE = 1
@@ -21,4 +33,190 @@ class CustomPagination(PageNumberPagination):
             'page': int(self.request.GET.get('page', DEFAULT_PAGE)), # can not set default = self.page
             'page_size': int(self.request.GET.get('page_size', self.page_size)),
             'results': data
-        })
\ No newline at end of file
+        })
+
+KEYSET_MAX_PAGE_SIZE = 100
+KEYSET_COUNT_TIMEOUT = 60
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination with opaque cursors.
+
+    Pages are selected with `WHERE (updated_at, id) < (last values)` style
+    conditions instead of OFFSET, so deep pages cost the same as the first
+    one. The ordering is taken from the filtered queryset (falling back to
+    the view's `keyset_ordering`) and the primary key is appended as a
+    tie breaker. A total is only computed when `?with_total=true` is
+    passed, and then cached for a short while.
+    """
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = KEYSET_MAX_PAGE_SIZE
+    cursor_query_param = 'cursor'
+    total_query_param = 'with_total'
+    count_timeout = KEYSET_COUNT_TIMEOUT
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_ordering(self, queryset, view):
+        ordering = []
+        terms = queryset.query.order_by or getattr(view, 'keyset_ordering', None) or queryset.model._meta.ordering
+        for term in terms:
+            if isinstance(term, OrderBy) and isinstance(term.expression, F):
+                term = ('-' if term.descending else '') + term.expression.name
+            if not isinstance(term, str):
+                raise ValueError(f'Unsupported keyset ordering term {term!r}')
+            ordering.append(term)
+
+        pk_name = queryset.model._meta.pk.name
+        ordering = [term.replace('pk', pk_name) if term.lstrip('-') == 'pk' else term for term in ordering]
+        if not any(term.lstrip('-') == pk_name for term in ordering):
+            descending = ordering[-1].startswith('-') if ordering else True
+            ordering.append(('-' if descending else '') + pk_name)
+        return ordering
+
+    def get_ordering_fields(self, queryset, view):
+        """
+        Columns the cursor is built from. Rows built with `.values()` must
+        include them.
+        """
+        return [term.lstrip('-') for term in self.get_ordering(queryset, view)]
+
+    def encode_cursor(self, values, reverse=False):
+        values = [value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value for value in values]
+        payload = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'), default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, value):
+        try:
+            padded = value + '=' * (-len(value) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            return payload['v'], bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound('Invalid cursor')
+
+    def get_ordering_field(self, queryset, path):
+        """
+        The model field (or annotation output field) behind an ordering
+        column, None when it cannot be resolved.
+        """
+        if path in queryset.query.annotations:
+            return queryset.query.annotations[path].output_field
+        model, field = queryset.model, None
+        for name in path.split('__'):
+            if model is None:
+                return None
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model
+        return field
+
+    def clean_cursor_values(self, queryset, ordering, values):
+        """
+        Convert the JSON values of a cursor back to the types of their
+        columns; raises ValidationError, ValueError or TypeError.
+        """
+        cleaned = []
+        for term, value in zip(ordering, values):
+            field = self.get_ordering_field(queryset, term.lstrip('-'))
+            if field is not None and value is not None:
+                value = field.to_python(value)
+            cleaned.append(value)
+        return cleaned
+
+    def get_row_value(self, row, field):
+        if isinstance(row, dict):
+            return row[field]
+        value = row
+        for part in field.split('__'):
+            value = getattr(value, part)
+        return value
+
+    def seek(self, queryset, ordering, values, reverse):
+        condition = Q()
+        equal = Q()
+        for term, value in zip(ordering, values):
+            field = term.lstrip('-')
+            descending = term.startswith('-') != reverse
+            lookup = f'{field}__lt' if descending else f'{field}__gt'
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{field: value})
+        return queryset.filter(condition)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        fields = self.get_ordering_fields(queryset, view)
+
+        self.total = None
+        if str(request.query_params.get(self.total_query_param, '')).lower() in ('1', 'true'):
+            self.total = self.get_total(queryset)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            if len(values) != len(self.ordering):
+                raise NotFound('Invalid cursor')
+            try:
+                values = self.clean_cursor_values(queryset, self.ordering, values)
+                queryset = self.seek(queryset, self.ordering, values, reverse)
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound('Invalid cursor')
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [term[1:] if term.startswith('-') else f'-{term}' for term in ordering]
+        rows = list(queryset.order_by(*ordering)[:self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if reverse:
+            rows.reverse()
+
+        # Walking backwards, `has_more` means there are rows before this page.
+        has_next = reverse or has_more
+        has_previous = has_more if reverse else bool(cursor)
+
+        self.next_cursor = self.previous_cursor = None
+        if rows and has_next:
+            self.next_cursor = self.encode_cursor([self.get_row_value(rows[-1], field) for field in fields])
+        if rows and has_previous:
+            self.previous_cursor = self.encode_cursor(
+                [self.get_row_value(rows[0], field) for field in fields], reverse=True,
+            )
+        return rows
+
+    def get_total(self, queryset):
+        query = str(queryset.order_by().query)
+        key = 'keyset-count:' + hashlib.md5(f'{queryset.model._meta.label}:{query}'.encode()).hexdigest()
+        total = cache.get(key)
+        if total is None:
+            total = queryset.order_by().count()
+            cache.set(key, total, self.count_timeout)
+        return total
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'links': {
+                'next': self.get_link(self.next_cursor),
+                'previous': self.get_link(self.previous_cursor),
+            },
+            'total': self.total,
+            'page_size': self.page_size_value,
+            'results': data,
+        })
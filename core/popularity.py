@@ -0,0 +1,56 @@
+"""
+Time-decayed popularity scores.
+
+Instead of decaying every stored score as time passes, each event adds
+`weight * 2 ** ((now - POPULARITY_EPOCH) / POPULARITY_HALF_LIFE)`, so
+newer events are worth exponentially more than older ones. Ordering by
+the stored column is then the same as ordering by the decayed score, and
+an event is a single `F('popularity') + x` update on an indexed column,
+which makes `ORDER BY popularity DESC LIMIT k` a top-K index scan.
+
+The growth leaves room for about 1000 half-lives (~19 years at one week)
+after the epoch before floats overflow.
+"""
+import datetime
+
+from django.db.models import F
+from django.utils import timezone
+
+from core.counters import BufferedCounter
+from core.response_cache import model_changed
+
+POPULARITY_EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+POPULARITY_HALF_LIFE = datetime.timedelta(days=7)
+
+VIEW_WEIGHT = 1
+
+
+def decay_factor(when=None):
+    when = when or timezone.now()
+    return 2 ** ((when - POPULARITY_EPOCH) / POPULARITY_HALF_LIFE)
+
+
+def current_score(popularity, now=None):
+    """
+    The stored popularity expressed in events as of `now`.
+    """
+    return popularity / decay_factor(now)
+
+
+def add_popularity(model, pk, weight, when=None):
+    model.objects.filter(pk=pk).update(popularity=F('popularity') + weight * decay_factor(when))
+    # update() sends no signals; cached rankings must not outlive the change.
+    model_changed(model)
+
+
+class PopularityCounter(BufferedCounter):
+    """
+    Buffered view events for the `popularity` column of `model`.
+    """
+
+    def __init__(self, model, weight=VIEW_WEIGHT, **kwargs):
+        super().__init__(model, 'popularity', **kwargs)
+        self.weight = weight
+
+    def get_increment(self, amount):
+        return amount * self.weight * decay_factor()
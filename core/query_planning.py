@@ -0,0 +1,161 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Case, IntegerField, OuterRef, Prefetch, Subquery, Value, When
+from parler.models import TranslatableModel
+from parler.utils.i18n import get_active_language_choices
+from parler_rest.fields import TranslatedFieldsField
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+def active_translations_prefetch(model, lookup='translations'):
+    """
+    Prefetch one translation per object: the active language, or the first
+    fallback language that has a row.
+    """
+    translations_model = model._parler_meta.root.model
+    languages = get_active_language_choices()
+    preference = Case(
+        *[When(language_code=code, then=Value(index)) for index, code in enumerate(languages)],
+        output_field=IntegerField(),
+    )
+    best = (
+        translations_model.objects.filter(master=OuterRef('master'), language_code__in=languages)
+        .order_by(preference)
+        .values('pk')[:1]
+    )
+    queryset = translations_model.objects.filter(pk=Subquery(best))
+    return Prefetch(lookup, queryset=queryset)
+
+
+def _is_relation(model, name):
+    try:
+        return model._meta.get_field(name).is_relation
+    except FieldDoesNotExist:
+        return False
+
+
+def _uses_translated_fields(serializer, model):
+    if not issubclass(model, TranslatableModel):
+        return False
+    translated = set(model._parler_meta.get_translated_fields())
+    for field in serializer.fields.values():
+        if not field.write_only and field.source in translated:
+            return True
+    return False
+
+
+def _hinted_lookups(serializer, name):
+    """
+    Read `Meta.select_related` / `Meta.prefetch_related` hints. A dict maps
+    field names to the lookups they need, so hints for fields dropped from
+    the serializer are skipped.
+    """
+    hints = getattr(serializer.Meta, name, [])
+    if not isinstance(hints, dict):
+        return list(hints)
+    lookups = []
+    for field_name, field_lookups in hints.items():
+        if field_name in serializer.fields:
+            lookups.extend(field_lookups)
+    return lookups
+
+
+def collect_lookups(serializer, prefix=''):
+    """
+    Walk the (readable) fields of a serializer and return the
+    `select_related` and `prefetch_related` lookups needed to render it
+    without per-row queries.
+
+    Nested single serializers become `select_related` joins, nested
+    `many=True` serializers become `Prefetch` objects whose querysets are
+    planned recursively. Serializers may list extra lookups needed by their
+    `SerializerMethodField`s in `Meta.select_related` / `Meta.prefetch_related`,
+    either as a list or as a dict keyed by field name.
+    """
+    model = serializer.Meta.model
+    select, prefetch = [], {}
+
+    for lookup in _hinted_lookups(serializer, 'select_related'):
+        select.append(prefix + lookup)
+    for lookup in _hinted_lookups(serializer, 'prefetch_related'):
+        prefetch[prefix + lookup] = prefix + lookup
+
+    if _uses_translated_fields(serializer, model):
+        lookup = prefix + model._parler_meta.root.rel_name
+        prefetch.setdefault(lookup, active_translations_prefetch(model, lookup))
+
+    for field in serializer.fields.values():
+        if field.write_only or not _is_relation(model, field.source):
+            continue
+        lookup = prefix + field.source
+
+        if isinstance(field, TranslatedFieldsField):
+            # All languages are rendered, so every translation row is needed.
+            prefetch[lookup] = lookup
+        elif isinstance(field, serializers.ListSerializer):
+            child = field.child
+            if isinstance(child, serializers.ModelSerializer):
+                queryset = plan_queryset(child.Meta.model._default_manager.all(), child)
+                prefetch[lookup] = Prefetch(lookup, queryset=queryset)
+            else:
+                prefetch[lookup] = lookup
+        elif isinstance(field, serializers.ModelSerializer):
+            select.append(lookup)
+            nested_select, nested_prefetch = collect_lookups(field, prefix=lookup + '__')
+            select.extend(nested_select)
+            for key, value in nested_prefetch.items():
+                prefetch.setdefault(key, value)
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetch[lookup] = lookup
+
+    return select, prefetch
+
+
+def plan_queryset(queryset, serializer):
+    """
+    Apply the lookups returned by `collect_lookups` to `queryset`.
+    """
+    if not isinstance(serializer, serializers.ModelSerializer):
+        return queryset
+    select, prefetch = collect_lookups(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch.values())
+    return queryset
+
+
+class QueryPlanMixin:
+    """
+    Viewset mixin that plans joins and prefetches from the serializer the
+    current action renders with, so a page of N rows costs a fixed number
+    of queries.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request is None or self.request.method not in ('GET', 'HEAD'):
+            return queryset
+        return plan_queryset(queryset, self.get_serializer())
+
+
+class ValuesListMixin:
+    """
+    Render the list action from the `.values()` rows built by the list
+    serializer's `get_values`, selecting the paginator's cursor columns too.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        cursor_columns = []
+        if self.paginator is not None and hasattr(self.paginator, 'get_ordering_fields'):
+            cursor_columns = self.paginator.get_ordering_fields(queryset, self)
+        rows = self.get_serializer().get_values(queryset, cursor_columns)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(rows, many=True)
+        return Response(serializer.data)
@@ -0,0 +1,145 @@
+"""
+Server-side cache for read-only API responses.
+
+Viewsets list the models their responses are built from in
+`cache_models`. Every model (and its parler translation model) watched
+with `watch_models` has a version number that is bumped by its
+post_save/post_delete signals, and the version numbers are part of the
+cache key, so an edit in the admin drops exactly the responses that
+depend on the edited model.
+
+Version bumps only reach other processes through a shared cache
+(CACHE_URL). With the local memory cache, responses are kept for
+`RESPONSE_CACHE_TIMEOUT` seconds, a few by default, so other workers
+serve stale data no longer than that.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.utils.translation import get_language
+from parler.models import TranslatableModel
+from rest_framework import permissions, views
+from rest_framework.response import Response
+
+from core.cache_versions import get_versions, bump_version
+
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+
+
+def model_version_name(model):
+    return f'model:{model._meta.label_lower}'
+
+
+def _increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_stats():
+    found = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = found.get(HITS_KEY, 0), found.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else None}
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+def model_changed(model):
+    """
+    Drop the cached responses built from `model`. The receivers of
+    `watch_models` call it; writes that send no signals, like
+    `QuerySet.update()`, call it themselves.
+    """
+    return bump_version(model_version_name(model))
+
+
+def watch_models(*models):
+    """
+    Bump the cache version of each model when it, its translations or its
+    many-to-many relations change.
+    """
+    for model in models:
+
+        def changed(sender, model=model, **kwargs):
+            model_changed(model)
+
+        senders = [model]
+        if issubclass(model, TranslatableModel):
+            senders.append(model._parler_meta.root.model)
+        for sender in senders:
+            label = sender._meta.label
+            post_save.connect(changed, sender=sender, weak=False, dispatch_uid=f'response-cache-{label}-save')
+            post_delete.connect(changed, sender=sender, weak=False, dispatch_uid=f'response-cache-{label}-delete')
+        for field in model._meta.local_many_to_many:
+            through = field.remote_field.through
+            m2m_changed.connect(
+                changed, sender=through, weak=False, dispatch_uid=f'response-cache-{through._meta.label}-m2m'
+            )
+
+
+class CachedResponseMixin:
+    """
+    Cache the data of `list` and `retrieve` responses (and of any action
+    that goes through `cached_response`). Responses carry an `X-Cache:
+    HIT|MISS` header.
+    """
+    cache_models = ()
+    # Seconds; None uses the RESPONSE_CACHE_TIMEOUT setting.
+    cache_timeout = None
+
+    def get_response_cache_key(self, request):
+        versions = get_versions([model_version_name(model) for model in self.cache_models])
+        accept_language = request.META.get('HTTP_ACCEPT_LANGUAGE', '')
+        # Serialized URLs are absolute, so the origin is part of the key.
+        origin = f'{request.scheme}://{request.get_host()}'
+        state = f'{origin}|{request.get_full_path()}|{accept_language}|{request.accepted_renderer.format}'
+        digest = hashlib.md5(state.encode()).hexdigest()
+        return f'response:{".".join(map(str, versions))}:{get_language()}:{digest}'
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            _increment(HITS_KEY)
+            data, status = cached
+            response = Response(data, status=status)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _increment(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = settings.RESPONSE_CACHE_TIMEOUT if self.cache_timeout is None else self.cache_timeout
+            cache.set(key, (response.data, response.status_code), timeout)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+
+class ResponseCacheStatsView(views.APIView):
+    """
+    Response cache hit/miss counters. `DELETE` resets them.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, format=None):
+        return Response(get_stats())
+
+    def delete(self, request, format=None):
+        reset_stats()
+        return Response(get_stats())
@@ -0,0 +1,167 @@
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = 'fields'
+INCLUDE_QUERY_PARAM = 'include'
+LANGUAGE_QUERY_PARAM = 'lang'
+ALL_LANGUAGES = 'all'
+
+
+def get_requested_fields(request):
+    """
+    Parse the `?fields=a,b` sparse fieldset parameter into a set of names.
+    """
+    if request is None:
+        return None
+    value = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_requested_includes(request):
+    """
+    Parse the `?include=a,b` parameter into a set of names.
+    """
+    if request is None:
+        return set()
+    value = request.query_params.get(INCLUDE_QUERY_PARAM, '')
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def wants_all_languages(request):
+    """
+    True for `?lang=all`, for writes, which take the `translations` map of
+    every language, and outside of a request.
+    """
+    if request is None:
+        return True
+    if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        return True
+    return request.query_params.get(LANGUAGE_QUERY_PARAM) == ALL_LANGUAGES
+
+
+class SparseFieldsetMixin:
+    """
+    Limit the top level serializer to the fields listed in `?fields=`.
+    Nested serializers are left untouched.
+    """
+
+    def _is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_top_level():
+            return fields
+        requested = get_requested_fields(self.context.get('request'))
+        if not requested:
+            return fields
+        sparse = {name: field for name, field in fields.items() if name in requested}
+        return sparse or fields
+
+
+class OptionalFieldsMixin:
+    """
+    Drop the expensive fields listed in `Meta.optional_fields` unless they
+    are asked for with `?include=`.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        included = get_requested_includes(self.context.get('request'))
+        for name in getattr(self.Meta, 'optional_fields', []):
+            if name not in included:
+                fields.pop(name, None)
+        return fields
+
+
+class TranslatedValueField(serializers.ReadOnlyField):
+    """
+    A translated field in the object's current language, or in the first
+    fallback language that has it.
+    """
+
+    def get_attribute(self, instance):
+        return instance.safe_translation_getter(self.source)
+
+
+class CompactTranslationsMixin:
+    """
+    Replace the `translations` map of every language with the translated
+    fields of the active language (see `core.middleware.LanguageMiddleware`)
+    as flat fields. `?lang=all` and writes keep the map.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'translations' not in fields or wants_all_languages(self.context.get('request')):
+            return fields
+        compact = {}
+        for name, field in fields.items():
+            if name != 'translations':
+                compact[name] = field
+                continue
+            for translated in self.Meta.model._parler_meta.get_translated_fields():
+                compact[translated] = TranslatedValueField()
+        return compact
+
+
+class StorageURLField(serializers.Field):
+    """
+    Render a stored file, or its name read from a `.values()` row, as an
+    absolute URL.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        name = getattr(value, 'name', value)
+        if not name:
+            return None
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Render an `image_variants` map built by `core.images` as absolute
+    URLs per size, plus ready made WebP and JPEG `srcset` strings.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def _url(self, name):
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+    def to_representation(self, value):
+        if not value or not value.get('sizes'):
+            return None
+        sizes = {
+            size: {
+                'width': variant['width'],
+                'webp': self._url(variant['webp']),
+                'jpeg': self._url(variant['jpeg']),
+            }
+            for size, variant in value['sizes'].items()
+        }
+        result = {'sizes': sizes}
+        for extension in ('webp', 'jpeg'):
+            result[f'srcset_{extension}'] = ', '.join(
+                f'{variant[extension]} {variant["width"]}w' for variant in sizes.values()
+            )
+        return result
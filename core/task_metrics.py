@@ -0,0 +1,109 @@
+"""
+Per task latency metrics.
+
+Every published task is stamped with its publish time. The worker then
+records how long the task waited in its queue and how long it ran.
+Totals are kept in the Django cache, so a shared cache (CACHE_URL) sums
+them over all workers.
+"""
+import time
+
+from celery.signals import before_task_publish, task_failure, task_postrun, task_prerun
+from django.core.cache import cache
+from rest_framework import permissions, views
+from rest_framework.response import Response
+
+from config.celery import app
+
+METRICS_TIMEOUT = None
+COUNTERS = ['count', 'failures', 'run_ms', 'max_run_ms', 'wait_ms', 'waited']
+PUBLISHED_HEADER = 'published_at'
+
+_started = {}
+
+
+def _key(task_name, counter):
+    return f'task-metrics:{task_name}:{counter}'
+
+
+def _add(key, amount):
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        cache.add(key, 0, timeout=METRICS_TIMEOUT)
+        cache.incr(key, amount)
+
+
+@before_task_publish.connect(dispatch_uid='task-metrics-publish')
+def stamp_published(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault(PUBLISHED_HEADER, time.time())
+
+
+@task_prerun.connect(dispatch_uid='task-metrics-prerun')
+def task_started(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.monotonic()
+    published = getattr(task.request, PUBLISHED_HEADER, None)
+    if published is not None:
+        _add(_key(task.name, 'wait_ms'), max(0, int((time.time() - published) * 1000)))
+        _add(_key(task.name, 'waited'), 1)
+
+
+@task_postrun.connect(dispatch_uid='task-metrics-postrun')
+def task_finished(task_id=None, task=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is None:
+        return
+    run_ms = int((time.monotonic() - started) * 1000)
+    _add(_key(task.name, 'count'), 1)
+    _add(_key(task.name, 'run_ms'), run_ms)
+    max_key = _key(task.name, 'max_run_ms')
+    if run_ms > (cache.get(max_key) or 0):
+        cache.set(max_key, run_ms, METRICS_TIMEOUT)
+
+
+@task_failure.connect(dispatch_uid='task-metrics-failure')
+def task_failed(sender=None, **kwargs):
+    _add(_key(sender.name, 'failures'), 1)
+
+
+def get_task_names():
+    app.loader.import_default_modules()
+    return sorted(name for name in app.tasks if not name.startswith('celery.'))
+
+
+def get_stats():
+    stats = {}
+    for name in get_task_names():
+        keys = {counter: _key(name, counter) for counter in COUNTERS}
+        found = cache.get_many(list(keys.values()))
+        values = {counter: found.get(key, 0) for counter, key in keys.items()}
+        if not values['count']:
+            continue
+        stats[name] = {
+            'count': values['count'],
+            'failures': values['failures'],
+            'avg_run_ms': values['run_ms'] / values['count'],
+            'max_run_ms': values['max_run_ms'],
+            'avg_wait_ms': values['wait_ms'] / values['waited'] if values['waited'] else None,
+        }
+    return stats
+
+
+def reset_stats():
+    cache.delete_many([_key(name, counter) for name in get_task_names() for counter in COUNTERS])
+
+
+class TaskStatsView(views.APIView):
+    """
+    Run count, failures, run time and queue wait per Celery task.
+    `DELETE` resets them.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, format=None):
+        return Response(get_stats())
+
+    def delete(self, request, format=None):
+        reset_stats()
+        return Response(get_stats())
@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Asserts that an endpoint stays within a fixed number of queries and that
+    the number does not grow with the number of rows on the page.
+    """
+
+    def count_queries(self, url, **extra):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries)
+
+    def assertQueryBudget(self, url, budget, grow=None, **extra):
+        queries = self.count_queries(url, **extra)
+        self.assertLessEqual(queries, budget, f'{url} ran {queries} queries, budget is {budget}')
+        if grow is not None:
+            grow()
+            self.assertEqual(
+                self.count_queries(url, **extra), queries, f'{url} query count grows with the number of rows'
+            )
@@ -0,0 +1,32 @@
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from core.hashers import TunedPBKDF2PasswordHasher, suggest_iterations
+
+
+@override_settings(PASSWORD_HASHERS=['core.hashers.TunedPBKDF2PasswordHasher'])
+class HasherTests(TestCase):
+    def test_iterations_setting(self):
+        with self.settings(PASSWORD_HASH_ITERATIONS=1000):
+            self.assertEqual(TunedPBKDF2PasswordHasher().iterations, 1000)
+        with self.settings(PASSWORD_HASH_ITERATIONS=None):
+            self.assertEqual(TunedPBKDF2PasswordHasher().iterations, PBKDF2PasswordHasher.iterations)
+
+    @override_settings(PASSWORD_HASH_ITERATIONS=1000)
+    def test_suggestion_never_below_default(self):
+        # 1000 iterations in 1 ms.
+        with mock.patch('core.hashers.time_hasher', return_value=1):
+            self.assertEqual(suggest_iterations(800), 800000)
+            self.assertEqual(suggest_iterations(100), PBKDF2PasswordHasher.iterations)
+
+    def test_login_rehashes(self):
+        with self.settings(PASSWORD_HASH_ITERATIONS=1000):
+            User.objects.create_user('buyer', password='secret')
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            self.assertIsNotNone(authenticate(username='buyer', password='secret'))
+        self.assertTrue(User.objects.get(username='buyer').password.startswith('pbkdf2_sha256$2000$'))
+
@@ -0,0 +1,79 @@
+from collections import Counter, defaultdict
+
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from parler.cache import MISSING, is_missing
+from parler.models import TranslatableModel
+from parler.utils import get_language_settings
+from parler.utils.i18n import get_active_language_choices
+
+
+def translated_subquery(model, field, outer_ref='pk'):
+    """
+    Expression selecting a translated field of `model` in the active
+    language, falling back to the configured fallback languages.
+    """
+    translations_model = model._parler_meta.root.model
+    subqueries = [
+        Subquery(
+            translations_model.objects.filter(master=OuterRef(outer_ref), language_code=language_code)
+            .values(field)[:1]
+        )
+        for language_code in get_active_language_choices()
+    ]
+    if len(subqueries) == 1:
+        return subqueries[0]
+    return Coalesce(*subqueries)
+
+
+# Model label -> number of objects whose current language had to fall back.
+FALLBACK_MISSES = Counter()
+
+
+def _related_objects(instances, path):
+    objects = instances
+    for name in path.split('__'):
+        objects = [getattr(obj, name) for obj in objects]
+        objects = [obj for obj in objects if obj is not None]
+    return objects
+
+
+def load_translations(instances, *related):
+    """
+    Fill the parler translation cache of `instances`, and of the objects
+    reached through the `related` attribute paths (e.g. 'product' or
+    'product__category'), with one query per model. Languages without a
+    row are marked missing, so the fallbacks are served from the same
+    query instead of one query per object and language.
+    """
+    instances = list(instances)
+    groups = defaultdict(dict)
+    for objects in [instances] + [_related_objects(instances, path) for path in related]:
+        for obj in objects:
+            if isinstance(obj, TranslatableModel) and obj.pk is not None:
+                groups[obj._meta.concrete_model].setdefault(obj.pk, []).append(obj)
+
+    for model, objects_by_pk in groups.items():
+        meta = model._parler_meta.root
+        current_languages = {obj.get_current_language() for objects in objects_by_pk.values() for obj in objects}
+        languages = []
+        for language_code in current_languages:
+            # The same chain parler walks when a translation is missing.
+            settings = get_language_settings(language_code)
+            for code in [language_code, settings['code'], *settings['fallbacks']]:
+                if code not in languages:
+                    languages.append(code)
+
+        translations = {}
+        rows = meta.model.objects.filter(master_id__in=list(objects_by_pk), language_code__in=languages)
+        for translation in rows:
+            translations[translation.master_id, translation.language_code] = translation
+
+        for pk, objects in objects_by_pk.items():
+            for obj in objects:
+                local_cache = obj._translations_cache[meta.model]
+                for language_code in languages:
+                    local_cache.setdefault(language_code, translations.get((pk, language_code), MISSING))
+                if is_missing(local_cache[obj.get_current_language()]):
+                    FALLBACK_MISSES[model._meta.label] += 1
+    return instances
@@ -0,0 +1,8 @@
+# gunicorn reads this file from the working directory.
+
+
+def worker_exit(server, worker):
+    # Write the view counters a worker still buffers before it goes away.
+    from core.counters import flush_counters
+
+    flush_counters()